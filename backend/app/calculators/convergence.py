@@ -0,0 +1,60 @@
+"""
+Convergence Detector - Sweep-line grouping of cycle events
+Events are sorted once and swept with a fixed-width window, so the cost
+grows with n log n instead of n^2 over long horizons and many tickers
+"""
+
+import bisect
+import os
+from datetime import date
+from typing import Dict, List, Optional
+
+class ConvergenceDetector:
+
+    # Events within WINDOW_DAYS of a group's first event join that group
+    WINDOW_DAYS = int(os.getenv("CONVERGENCE_WINDOW_DAYS", 3))
+
+    # Groups with fewer events are not convergences
+    MIN_CYCLES = int(os.getenv("CONVERGENCE_MIN_CYCLES", 2))
+
+    # Groups this large are MEGA pressure, smaller ones HIGH
+    MEGA_CYCLES = 3
+
+    def __init__(self, window_days: Optional[int] = None, min_cycles: Optional[int] = None):
+        self.window_days = self.WINDOW_DAYS if window_days is None else window_days
+        self.min_cycles = self.MIN_CYCLES if min_cycles is None else min_cycles
+
+    def detect(self, events: List[Dict], today: date, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Convergences among events (dicts with date and name, sorted by date),
+        earliest first. A group starts at the first event not yet grouped
+        and takes every later event within window_days of it
+        """
+        ordinals = [e['date'].toordinal() for e in events]
+        convergences = []
+
+        start = 0
+        while start < len(events) and (limit is None or len(convergences) < limit):
+            end = bisect.bisect_right(ordinals, ordinals[start] + self.window_days, start)
+            if end - start >= self.min_cycles:
+                convergences.append(self._convergence(events[start:end], today))
+            start = end
+
+        return convergences
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _convergence(self, group: List[Dict], today: date) -> Dict:
+        first = group[0]['date']
+        convergence = {
+            "date": first.strftime('%Y-%m-%d'),
+            "days_until": (first.date() - today).days,
+            "cycle_count": len(group),
+            "cycles": [e['name'] for e in group],
+            "pressure": "MEGA" if len(group) >= self.MEGA_CYCLES else "HIGH"
+        }
+        if any('tickers' in e for e in group):
+            convergence["tickers"] = sorted({t for e in group for t in e.get('tickers', [])})
+        return convergence
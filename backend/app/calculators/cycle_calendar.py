@@ -0,0 +1,183 @@
+"""
+Cycle Calendar - Precomputed index of specialist cycle events
+Every 214d, T+35, 147-day and OPEX date over the horizon is generated once
+and kept sorted, so "is active", "next event" and "events in range" are
+bisect lookups instead of loops over the cycle sequence
+"""
+
+import bisect
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import numpy as np
+
+class CycleParameters(NamedTuple):
+    origin: date  # 214d pattern and T+35 anchor
+    moass: date  # 147-day anchor
+    base_cycle_days: int
+    compression_ratio: float
+    pattern_cycles: int = 10
+    ftd_cycle_days: int = 35
+    major_cycle_days: int = 147
+
+class CycleCalendar:
+
+    # Days past the build date covered by the index
+    HORIZON_DAYS = int(os.getenv("CYCLE_HORIZON_DAYS", 3 * 365))
+
+    OPEX_MONTHS = [3, 6, 9, 12]
+
+    NAMES = {
+        "214d_pattern": "214d Cycle #{number}",
+        "ftd35": "T+35 FTD Settlement",
+        "147day": "147-Day Major Cycle",
+        "opex": "Quarterly OPEX"
+    }
+
+    # A cycle is active from `before` days ahead of its event to `after` days past it
+    ACTIVE_WINDOWS = {
+        "214d_pattern": (3, -1),  # Last 3 days of the cycle, not the completion day
+        "ftd35": (0, 0),
+        "147day": (0, 3),
+        "opex": (3, 3)
+    }
+
+    def __init__(self, params: CycleParameters, start: Optional[date] = None, end: Optional[date] = None):
+        self.params = params
+        self.start = start or min(params.origin, params.moass)
+        self.end = end or date.today() + timedelta(days=self.HORIZON_DAYS)
+
+        events = (
+            self._pattern_events() +
+            self._periodic_events("ftd35", params.origin, params.ftd_cycle_days) +
+            self._periodic_events("147day", params.moass, params.major_cycle_days) +
+            self._opex_events()
+        )
+        events.sort(key=lambda e: (e['date'], e['type']))
+
+        # Per-type sorted ordinals for bisect, plus one merged ordering
+        self._events = events
+        self._ordinals = [e['date'].toordinal() for e in events]
+        self._by_type = {}
+        for event in events:
+            ordinals, typed = self._by_type.setdefault(event['type'], ([], []))
+            ordinals.append(event['date'].toordinal())
+            typed.append(event)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def covers(self, day: date) -> bool:
+        """True if day falls inside the indexed range"""
+        return self.start <= day <= self.end
+
+    def events(self, start: date, end: date, types: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Events with start <= date < end, sorted by date"""
+        if types is None:
+            lo = bisect.bisect_left(self._ordinals, start.toordinal())
+            hi = bisect.bisect_left(self._ordinals, end.toordinal())
+            return self._events[lo:hi]
+
+        found = []
+        for event_type in types:
+            ordinals, typed = self._by_type.get(event_type, ([], []))
+            lo = bisect.bisect_left(ordinals, start.toordinal())
+            hi = bisect.bisect_left(ordinals, end.toordinal())
+            found.extend(typed[lo:hi])
+        found.sort(key=lambda e: (e['date'], e['type']))
+        return found
+
+    def next_event(self, event_type: str, after: date) -> Optional[Dict]:
+        """First event of event_type strictly after `after`"""
+        ordinals, typed = self._by_type.get(event_type, ([], []))
+        i = bisect.bisect_right(ordinals, after.toordinal())
+        return typed[i] if i < len(typed) else None
+
+    def is_active(self, event_type: str, day: date) -> bool:
+        """True if day falls in an event's active window"""
+        before, after = self.ACTIVE_WINDOWS[event_type]
+        ordinals, _ = self._by_type.get(event_type, ([], []))
+        lo = bisect.bisect_left(ordinals, day.toordinal() - after)
+        return lo < len(ordinals) and ordinals[lo] <= day.toordinal() + before
+
+    def active_types(self, day: date) -> List[str]:
+        """Cycle types active on day"""
+        return [t for t in self.ACTIVE_WINDOWS if self.is_active(t, day)]
+
+    def is_active_many(self, event_type: str, days: np.ndarray) -> np.ndarray:
+        """is_active for an array of day ordinals, as a boolean array"""
+        before, after = self.ACTIVE_WINDOWS[event_type]
+        ordinals = self._type_ordinals(event_type)
+        if not len(ordinals):
+            return np.zeros(len(days), dtype=bool)
+        lo = np.searchsorted(ordinals, days - after, side="left")
+        found = lo < len(ordinals)
+        return found & (ordinals[np.minimum(lo, len(ordinals) - 1)] <= days + before)
+
+    def days_to_next_many(self, event_type: str, days: np.ndarray) -> np.ndarray:
+        """Days from each day ordinal to the next event strictly after it, inf if none"""
+        ordinals = self._type_ordinals(event_type)
+        if not len(ordinals):
+            return np.full(len(days), np.inf)
+        i = np.searchsorted(ordinals, days, side="right")
+        found = i < len(ordinals)
+        return np.where(found, ordinals[np.minimum(i, len(ordinals) - 1)] - days, np.inf)
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _type_ordinals(self, event_type: str) -> np.ndarray:
+        ordinals, _ = self._by_type.get(event_type, ([], []))
+        return np.asarray(ordinals, dtype=np.int64)
+
+    def _event(self, event_type: str, day: date, number: int = 0, **extra) -> Dict:
+        return {
+            "type": event_type,
+            "name": self.NAMES[event_type].format(number=number),
+            "date": datetime.combine(day, datetime.min.time()),
+            **extra
+        }
+
+    def _pattern_events(self) -> List[Dict]:
+        """Compressing 214d sequence: each cycle is COMPRESSION_RATIO of the last"""
+        events = []
+        length = self.params.base_cycle_days
+        day = self.params.origin
+
+        for i in range(self.params.pattern_cycles):
+            if i > 0:
+                length *= self.params.compression_ratio
+            days = round(length)
+            day += timedelta(days=days)
+            if day > self.end:
+                break
+            events.append(self._event("214d_pattern", day, number=i + 1, cycle_length=days))
+
+        return events
+
+    def _periodic_events(self, event_type: str, anchor: date, period: int) -> List[Dict]:
+        """Every `period` days from anchor, in both directions, within range"""
+        offset = (self.start - anchor).days
+        day = anchor + timedelta(days=-(-offset // period) * period)  # First on/after start
+
+        events = []
+        while day <= self.end:
+            events.append(self._event(event_type, day))
+            day += timedelta(days=period)
+        return events
+
+    def _opex_events(self) -> List[Dict]:
+        """Third Friday of each quarter-end month"""
+        events = []
+        for year in range(self.start.year, self.end.year + 1):
+            for month in self.OPEX_MONTHS:
+                day = self._third_friday(year, month)
+                if self.start <= day <= self.end:
+                    events.append(self._event("opex", day))
+        return events
+
+    @staticmethod
+    def _third_friday(year: int, month: int) -> date:
+        first = date(year, month, 1)
+        return first + timedelta(days=(4 - first.weekday()) % 7 + 14)
@@ -3,9 +3,29 @@ GME/AMC Specialist Calculator
 Uses custom cycles: 214d pattern, T+35, 147-day, warrants, basket theory
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, List
-import yfinance as yf
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from app.calculators.convergence import ConvergenceDetector
+from app.calculators.cycle_calendar import CycleCalendar, CycleParameters
+from app.utils.cycle_store import CycleStore
+from app.utils.data_fetcher import DataFetcher, TickerUnavailable
+from app.utils.profiling import span
+
+# datetime64[D] counts days from 1970-01-01; date ordinals count from 0001-01-01
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Score columns of a backtest frame, keyed like calculate_probability's breakdown
+BREAKDOWN_COLUMNS = [
+    "cycle_convergence",
+    "warrant_proximity",
+    "ftd_accumulation",
+    "options_gamma",
+    "short_interest",
+    "sentiment"
+]
 
 class GMESpecialistCalculator:
     
@@ -23,8 +43,40 @@ class GMESpecialistCalculator:
     BASE_CYCLE_DAYS = 214
     COMPRESSION_RATIO = 0.64  # 7-4-1 fractal
     
-    def __init__(self):
-        self.cycle_data = {}
+    # Component weights; AMC has no warrants
+    WEIGHTS = {
+        "GME": {'cycle': 0.30, 'warrant': 0.15, 'ftd': 0.20, 'gamma': 0.15, 'short': 0.10, 'sentiment': 0.10},
+        "AMC": {'cycle': 0.35, 'ftd': 0.25, 'gamma': 0.15, 'short': 0.15, 'sentiment': 0.10}
+    }
+    
+    # (minimum probability, confidence), highest first; below all of them is LOW
+    CONFIDENCE_LEVELS = [(70, "HIGH"), (50, "MODERATE")]
+    
+    # Calendar padding around a backtest range, wider than any active window or look-ahead
+    BACKTEST_MARGIN_DAYS = 10
+    
+    # (first, last) day offsets from today listed by get_upcoming_cycles, both inclusive
+    # 214d and OPEX only list events after today
+    UPCOMING_WINDOWS = {
+        "214d_pattern": (1, 365),
+        "ftd35": (0, 89),
+        "147day": (0, 179),
+        "opex": (1, 360)
+    }
+    
+    ACTIVE_CYCLE_NAMES = {
+        "214d_pattern": "214-Day Accelerating Pattern",
+        "ftd35": "T+35 FTD Settlement",
+        "147day": "147-Day Major Cycle",
+        "opex": "Quarterly OPEX"
+    }
+    
+    def __init__(self, data_fetcher: Optional[DataFetcher] = None, cycle_store: Optional[CycleStore] = None):
+        self.data_fetcher = data_fetcher or DataFetcher()
+        self.cycle_store = cycle_store  # Durable webhook cycles, None = webhooks are not kept
+        self.calendar = None
+        self.rebuild_calendar()
+        self.convergence_detector = ConvergenceDetector()
     
     def calculate_probability(self, ticker: str) -> Dict:
         """
@@ -32,59 +84,61 @@ class GMESpecialistCalculator:
         Returns 0-100% with detailed breakdown
         """
         now = datetime.now()
-        
-        # Get current price
-        price = self._get_current_price(ticker)
-        
+        with span("probability.price"):
+            price = self._get_current_price(ticker)
+        with span("probability.stored_cycles"):
+            stored = self._stored_cycles_ahead(ticker, now)
+        return self._build_probability(ticker, price, stored, now)
+    
+    async def calculate_probability_async(self, ticker: str) -> Dict:
+        """Non-blocking calculate_probability"""
+        now = datetime.now()
+        with span("probability.price"):
+            price = await self._get_current_price_async(ticker)
+        with span("probability.stored_cycles"):
+            # SQLite reads stay off the event loop
+            stored = [] if self.cycle_store is None else await self.data_fetcher.run(
+                self._stored_cycles_ahead, ticker, now
+            )
+        return self._build_probability(ticker, price, stored, now)
+    
+    def _build_probability(self, ticker: str, price: float, stored: List[Dict], now: datetime) -> Dict:
+        """Score all components for a known price and the ticker's stored webhook cycles"""
         # Calculate cycle scores
-        cycle_score = self._calculate_cycle_convergence(now)
-        warrant_score = self._calculate_warrant_proximity(price) if ticker == "GME" else 0
-        ftd_score = self._estimate_ftd_pressure(ticker, now)
-        gamma_score = self._estimate_gamma_exposure(ticker)
-        short_score = self._estimate_short_pressure(ticker)
-        sentiment_score = self._estimate_sentiment(ticker)
+        with span("probability.cycle_convergence"):
+            cycle_score = self._calculate_cycle_convergence(now, stored)
+        with span("probability.warrant_proximity"):
+            warrant_score = self._calculate_warrant_proximity(price) if ticker == "GME" else 0
+        with span("probability.ftd_pressure"):
+            ftd_score = self._estimate_ftd_pressure(ticker, now)
+        with span("probability.gamma_exposure"):
+            gamma_score = self._estimate_gamma_exposure(ticker)
+        with span("probability.short_pressure"):
+            short_score = self._estimate_short_pressure(ticker)
+        with span("probability.sentiment"):
+            sentiment_score = self._estimate_sentiment(ticker)
         
         # Weighted probability
-        if ticker == "GME":
-            weights = {
-                'cycle': 0.30,
-                'warrant': 0.15,
-                'ftd': 0.20,
-                'gamma': 0.15,
-                'short': 0.10,
-                'sentiment': 0.10
-            }
-            probability = (
-                cycle_score * weights['cycle'] +
-                warrant_score * weights['warrant'] +
-                ftd_score * weights['ftd'] +
-                gamma_score * weights['gamma'] +
-                short_score * weights['short'] +
-                sentiment_score * weights['sentiment']
-            )
-        else:  # AMC
-            weights = {
-                'cycle': 0.35,
-                'ftd': 0.25,
-                'gamma': 0.15,
-                'short': 0.15,
-                'sentiment': 0.10
-            }
-            probability = (
-                cycle_score * weights['cycle'] +
-                ftd_score * weights['ftd'] +
-                gamma_score * weights['gamma'] +
-                short_score * weights['short'] +
-                sentiment_score * weights['sentiment']
-            )
+        scores = {
+            'cycle': cycle_score,
+            'warrant': warrant_score,
+            'ftd': ftd_score,
+            'gamma': gamma_score,
+            'short': short_score,
+            'sentiment': sentiment_score
+        }
+        weights = self._weights(ticker)
+        probability = sum(scores[name] * weight for name, weight in weights.items())
         
         # Determine confidence level
-        if probability >= 70:
-            confidence = "HIGH"
-        elif probability >= 50:
-            confidence = "MODERATE"
-        else:
-            confidence = "LOW"
+        confidence = next(
+            (label for floor, label in self.CONFIDENCE_LEVELS if probability >= floor), "LOW"
+        )
+        
+        with span("probability.active_cycles"):
+            active_cycles = self._get_active_cycles(now)
+        with span("probability.upcoming_convergences"):
+            upcoming = self._get_upcoming_convergences(now, stored)
         
         return {
             "ticker": ticker,
@@ -98,40 +152,60 @@ class GMESpecialistCalculator:
                 "short_interest": round(short_score, 1),
                 "sentiment": round(sentiment_score, 1)
             },
-            "active_cycles": self._get_active_cycles(now),
-            "upcoming_convergences": self._get_upcoming_convergences(now),
+            "active_cycles": active_cycles,
+            "upcoming_convergences": upcoming,
             "timestamp": now.isoformat()
         }
     
     def get_upcoming_cycles(self, ticker: str) -> List[Dict]:
         """Get all upcoming cycle dates"""
+        return self._upcoming_cycles(datetime.now())
+    
+    def get_convergences(
+        self,
+        tickers: List[str],
+        days_ahead: int = 365,
+        window_days: Optional[int] = None,
+        min_cycles: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Cycle convergences over the next days_ahead days across tickers
+        An event shared by several tickers counts once, tagged with all of them
+        """
         now = datetime.now()
-        cycles = []
-        
-        # 214-day accelerating pattern
-        pattern_cycles = self._calculate_214d_cycles()
-        cycles.extend(pattern_cycles)
+        today = now.date()
+        calendar = self._get_calendar(now, days_ahead)
         
-        # T+35 FTD cycles
-        ftd_cycles = self._calculate_ftd35_cycles(now, days_ahead=90)
-        cycles.extend(ftd_cycles)
+        end = today + timedelta(days=days_ahead)
+        events = [{**event, "tickers": list(tickers)} for event in calendar.events(today, end)]
+        events.extend(self._stored_cycles(tickers, today, end))
+        events.sort(key=lambda e: e['date'])
         
-        # 147-day cycles
-        cycle_147 = self._calculate_147_cycles(now, days_ahead=180)
-        cycles.extend(cycle_147)
-        
-        # OPEX dates
-        opex_dates = self._calculate_opex_dates(now, quarters_ahead=4)
-        cycles.extend(opex_dates)
-        
-        # Sort by date
-        cycles.sort(key=lambda x: x['date'])
-        
-        return cycles
+        detector = ConvergenceDetector(window_days, min_cycles)
+        return detector.detect(events, today, limit)
+    
+    async def get_convergences_async(
+        self,
+        tickers: List[str],
+        days_ahead: int = 365,
+        window_days: Optional[int] = None,
+        min_cycles: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Non-blocking get_convergences (reads the cycle store)"""
+        return await self.data_fetcher.run(self.get_convergences, tickers, days_ahead, window_days, min_cycles, limit)
     
     def get_warrant_status(self) -> Dict:
         """Get GME warrant status"""
-        price = self._get_current_price("GME")
+        return self._build_warrant_status(self._get_current_price("GME"))
+    
+    async def get_warrant_status_async(self) -> Dict:
+        """Non-blocking get_warrant_status"""
+        return self._build_warrant_status(await self._get_current_price_async("GME"))
+    
+    def _build_warrant_status(self, price: float) -> Dict:
+        """Warrant status for a known GME price"""
         now = datetime.now()
         
         distance_to_itm = max(0, self.WARRANT_STRIKE - price)
@@ -162,12 +236,65 @@ class GMESpecialistCalculator:
             "status": "ITM" if price >= self.WARRANT_STRIKE else "OTM"
         }
     
+    def backtest(self, tickers: List[str], start: date, end: Optional[date] = None) -> Dict:
+        """
+        Daily probability series per ticker over start..end (inclusive),
+        one entry per trading day with that day's close
+        """
+        end = end or date.today()
+        frames = self.backtest_frames(tickers, start, end)
+        return {
+            "tickers": list(tickers),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "series": {ticker: self._backtest_series(ticker, frame) for ticker, frame in frames.items()}
+        }
+    
+    async def backtest_async(self, tickers: List[str], start: date, end: Optional[date] = None) -> Dict:
+        """Non-blocking backtest"""
+        return await self.data_fetcher.run(self.backtest, tickers, start, end)
+    
+    def backtest_frames(self, tickers: List[str], start: date, end: Optional[date] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Component scores and probability for every trading day, one frame per
+        ticker indexed by date. Each day is scored the way calculate_probability
+        would score it at the start of that day, for the whole range at once
+        """
+        end = end or date.today()
+        with span("backtest.prices"):
+            prices = self.data_fetcher.get_bulk_history(tickers, period="max", start=start)
+        
+        with span("backtest.score"):
+            margin = timedelta(days=self.BACKTEST_MARGIN_DAYS)
+            calendar = CycleCalendar(self.cycle_parameters(), start=start - margin, end=end + margin)
+            frames = {}
+            for ticker in tickers:
+                closes = self._backtest_closes(prices, ticker, start, end)
+                frames[ticker] = self._score_days(ticker, closes, calendar)
+        return frames
+    
+    def cycle_parameters(self) -> CycleParameters:
+        """Parameters the cycle calendar is built from"""
+        return CycleParameters(
+            origin=self.ORIGIN_DATE.date(),
+            moass=self.MOASS_2021.date(),
+            base_cycle_days=self.BASE_CYCLE_DAYS,
+            compression_ratio=self.COMPRESSION_RATIO
+        )
+    
+    def rebuild_calendar(self, end=None) -> CycleCalendar:
+        """Regenerate the cycle calendar from the current parameters"""
+        self.calendar = CycleCalendar(self.cycle_parameters(), end=end)
+        return self.calendar
+    
     def update_cycle_data(self, data: Dict):
         """Update cycle data from Pine Script webhook"""
-        ticker = data['ticker']
-        if ticker not in self.cycle_data:
-            self.cycle_data[ticker] = []
-        self.cycle_data[ticker].append(data)
+        self.update_cycle_data_batch([data])
+    
+    def update_cycle_data_batch(self, batch: List[Dict]):
+        """Record many webhook events in the cycle store, if there is one"""
+        if self.cycle_store is not None:
+            self.cycle_store.insert_many(batch)
     
     # ==========================================
     # PRIVATE HELPER METHODS
@@ -176,204 +303,163 @@ class GMESpecialistCalculator:
     def _get_current_price(self, ticker: str) -> float:
         """Get current stock price"""
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="1d")
-            if not data.empty:
-                return float(data['Close'].iloc[-1])
-            return 0.0
-        except:
-            # Fallback prices for demo
-            return 20.50 if ticker == "GME" else 4.50
-    
-    def _calculate_cycle_convergence(self, now: datetime) -> float:
+            return self._last_close(self.data_fetcher.get_history(ticker, period="1d"))
+        except Exception:
+            return self._fallback_price(ticker)
+    
+    async def _get_current_price_async(self, ticker: str) -> float:
+        """Non-blocking _get_current_price"""
+        try:
+            return self._last_close(await self.data_fetcher.get_history_async(ticker, period="1d"))
+        except Exception:
+            return self._fallback_price(ticker)
+    
+    def _last_close(self, data: pd.DataFrame) -> float:
+        """Last close from a history frame"""
+        if not data.empty:
+            return float(data['Close'].iloc[-1])
+        return 0.0
+    
+    def _fallback_price(self, ticker: str) -> float:
+        """Fallback prices for demo"""
+        return 20.50 if ticker == "GME" else 4.50
+    
+    def _weights(self, ticker: str) -> Dict[str, float]:
+        return self.WEIGHTS["GME" if ticker == "GME" else "AMC"]
+    
+    def _calculate_cycle_convergence(self, now: datetime, stored: Optional[List[Dict]] = None) -> float:
         """
         Calculate cycle convergence score (0-100)
         Higher when multiple cycles align
         """
+        calendar = self._get_calendar(now)
+        today = now.date()
         active_count = 0
         upcoming_count = 0
         
         # Check 214d pattern
-        days_from_origin = (now - self.ORIGIN_DATE).days
-        if self._is_214d_active(days_from_origin):
+        if calendar.is_active("214d_pattern", today):
             active_count += 2  # Weight this heavily
         
         # Check if 214d cycle within 7 days
-        next_214d = self._get_next_214d_date(days_from_origin)
-        if next_214d and (next_214d - now).days <= 7:
+        next_214d = calendar.next_event("214d_pattern", today)
+        if next_214d and (next_214d['date'] - now).days <= 7:
             upcoming_count += 1
         
         # Check T+35
-        ftd_position = days_from_origin % 35
-        if ftd_position == 0:
+        if calendar.is_active("ftd35", today):
             active_count += 1
-        elif ftd_position >= 30:
+        elif self._days_to_next(calendar, "ftd35", today) <= 5:
             upcoming_count += 1
         
         # Check 147-day
-        days_from_moass = (now - self.MOASS_2021).days
-        c147_position = days_from_moass % 147
-        if c147_position <= 3:
+        if calendar.is_active("147day", today):
             active_count += 1
-        elif c147_position >= 140:
+        elif self._days_to_next(calendar, "147day", today) <= 7:
             upcoming_count += 1
         
         # Check OPEX (3rd Friday of Mar/Jun/Sep/Dec)
-        if self._is_opex_week(now):
+        if calendar.is_active("opex", today):
             active_count += 1
         
+        # Check webhook cycles (one per cycle type)
+        if stored:
+            week = [e for e in stored if today <= e['date'].date() < today + timedelta(days=8)]
+            active_count += len({e['type'] for e in week if e['date'].date() == today})
+            upcoming_count += len({e['type'] for e in week if e['date'].date() > today})
+        
         # Calculate score
         score = (active_count * 20) + (upcoming_count * 10)
         return min(100, score)
     
-    def _is_214d_active(self, days_from_origin: int) -> bool:
-        """Check if 214d pattern cycle is active"""
-        current_length = self.BASE_CYCLE_DAYS
-        total_days = 0
-        
-        for cycle_num in range(10):
-            if cycle_num > 0:
-                current_length = current_length * self.COMPRESSION_RATIO
-            
-            cycle_days = round(current_length)
-            
-            if total_days <= days_from_origin < total_days + cycle_days:
-                # Check if within 3-day window of completion
-                position_in_cycle = days_from_origin - total_days
-                return position_in_cycle >= cycle_days - 3
-            
-            total_days += cycle_days
-            
-            if total_days > days_from_origin + 365:
-                break
-        
-        return False
-    
-    def _get_next_214d_date(self, days_from_origin: int) -> datetime:
-        """Get next 214d cycle completion date"""
-        current_length = self.BASE_CYCLE_DAYS
-        total_days = 0
-        
-        for cycle_num in range(10):
-            if cycle_num > 0:
-                current_length = current_length * self.COMPRESSION_RATIO
-            
-            cycle_days = round(current_length)
-            total_days += cycle_days
-            
-            if total_days > days_from_origin:
-                return self.ORIGIN_DATE + timedelta(days=total_days)
-        
-        return None
-    
-    def _calculate_214d_cycles(self) -> List[Dict]:
-        """Calculate all 214d pattern cycles"""
-        cycles = []
-        now = datetime.now()
-        
-        current_length = self.BASE_CYCLE_DAYS
-        current_date = self.ORIGIN_DATE
-        
-        for i in range(10):
-            if i > 0:
-                current_length = current_length * self.COMPRESSION_RATIO
-            
-            days = round(current_length)
-            current_date = current_date + timedelta(days=days)
-            
-            if current_date > now and current_date < now + timedelta(days=365):
-                cycles.append({
-                    "type": "214d_pattern",
-                    "name": f"214d Cycle #{i+1}",
-                    "date": current_date,
-                    "days_until": (current_date - now).days,
-                    "cycle_length": days
-                })
-        
-        return cycles
+    def _cycle_convergence_many(self, days: np.ndarray, calendar: CycleCalendar, ticker: Optional[str] = None) -> np.ndarray:
+        """_calculate_cycle_convergence for an array of day ordinals"""
+        active_count = np.zeros(len(days), dtype=np.int64)
+        upcoming_count = np.zeros(len(days), dtype=np.int64)
+        
+        active_count += 2 * calendar.is_active_many("214d_pattern", days)
+        upcoming_count += calendar.days_to_next_many("214d_pattern", days) <= 7
+        
+        ftd_active = calendar.is_active_many("ftd35", days)
+        active_count += ftd_active
+        upcoming_count += ~ftd_active & (calendar.days_to_next_many("ftd35", days) <= 5)
+        
+        major_active = calendar.is_active_many("147day", days)
+        active_count += major_active
+        upcoming_count += ~major_active & (calendar.days_to_next_many("147day", days) <= 7)
+        
+        active_count += calendar.is_active_many("opex", days)
+        
+        # Webhook cycles: each type counts once on its day and once in the 7 days before
+        if ticker and len(days):
+            first = date.fromordinal(int(days[0]))
+            last = date.fromordinal(int(days[-1]))
+            by_type = {}
+            for event in self._stored_cycles([ticker], first, last + timedelta(days=8)):
+                by_type.setdefault(event['type'], set()).add(event['date'].toordinal())
+            for ordinals in by_type.values():
+                ordinals = np.array(sorted(ordinals), dtype=np.int64)
+                after_day = np.searchsorted(ordinals, days, side="right")
+                active_count += after_day > np.searchsorted(ordinals, days, side="left")
+                upcoming_count += np.searchsorted(ordinals, days + 8, side="left") > after_day
+        
+        return np.minimum(100, active_count * 20 + upcoming_count * 10).astype(float)
     
-    def _calculate_ftd35_cycles(self, now: datetime, days_ahead: int) -> List[Dict]:
-        """Calculate upcoming T+35 FTD cycles"""
-        cycles = []
-        days_from_origin = (now - self.ORIGIN_DATE).days
-        
-        current_position = days_from_origin % 35
-        days_to_next = 35 - current_position if current_position != 0 else 0
-        
-        for i in range(days_ahead // 35 + 1):
-            next_date = now + timedelta(days=days_to_next + (i * 35))
-            if next_date < now + timedelta(days=days_ahead):
-                cycles.append({
-                    "type": "ftd35",
-                    "name": "T+35 FTD Settlement",
-                    "date": next_date,
-                    "days_until": (next_date - now).days
-                })
-        
-        return cycles
+    def _get_calendar(self, now: datetime, days_ahead: int = 0) -> CycleCalendar:
+        """Cycle calendar, rebuilt if parameters changed or lookups would pass its horizon"""
+        days_ahead = max(days_ahead, max(last for _, last in self.UPCOMING_WINDOWS.values()))
+        last_needed = now.date() + timedelta(days=days_ahead)
+        if self.calendar.params != self.cycle_parameters():
+            self.rebuild_calendar(max(last_needed, self.calendar.end))
+        elif not self.calendar.covers(last_needed):
+            self.rebuild_calendar(max(last_needed, now.date() + timedelta(days=CycleCalendar.HORIZON_DAYS)))
+        return self.calendar
     
-    def _calculate_147_cycles(self, now: datetime, days_ahead: int) -> List[Dict]:
-        """Calculate upcoming 147-day cycles"""
-        cycles = []
-        days_from_moass = (now - self.MOASS_2021).days
-        
-        current_position = days_from_moass % 147
-        days_to_next = 147 - current_position if current_position != 0 else 0
-        
-        for i in range(days_ahead // 147 + 1):
-            next_date = now + timedelta(days=days_to_next + (i * 147))
-            if next_date < now + timedelta(days=days_ahead):
-                cycles.append({
-                    "type": "147day",
-                    "name": "147-Day Major Cycle",
-                    "date": next_date,
-                    "days_until": (next_date - now).days
-                })
-        
-        return cycles
+    def _days_to_next(self, calendar: CycleCalendar, cycle_type: str, today) -> float:
+        """Days until the next event of cycle_type after today"""
+        event = calendar.next_event(cycle_type, today)
+        return (event['date'].date() - today).days if event else float('inf')
     
-    def _calculate_opex_dates(self, now: datetime, quarters_ahead: int) -> List[Dict]:
-        """Calculate upcoming quarterly OPEX dates"""
-        cycles = []
-        opex_months = [3, 6, 9, 12]
-        
-        for year_offset in range(2):
-            for month in opex_months:
-                year = now.year + year_offset
-                opex_date = self._get_third_friday(year, month)
-                
-                if opex_date > now and opex_date < now + timedelta(days=quarters_ahead * 90):
-                    cycles.append({
-                        "type": "opex",
-                        "name": "Quarterly OPEX",
-                        "date": opex_date,
-                        "days_until": (opex_date - now).days
-                    })
-        
-        return cycles
+    def _stored_cycles_ahead(self, ticker: str, now: datetime) -> List[Dict]:
+        """Stored webhook cycles for ticker over the next year, read once per probability"""
+        today = now.date()
+        return self._stored_cycles([ticker], today, today + timedelta(days=365))
     
-    def _get_third_friday(self, year: int, month: int) -> datetime:
-        """Get third Friday of month"""
-        date = datetime(year, month, 1)
-        fridays = 0
-        
-        while fridays < 3:
-            if date.weekday() == 4:  # Friday
-                fridays += 1
-            if fridays < 3:
-                date = date + timedelta(days=1)
-        
-        return date
+    def _stored_cycles(self, tickers: List[str], start: date, end: date) -> List[Dict]:
+        """Webhook cycles from the cycle store with start <= date < end, as calendar-style events"""
+        if self.cycle_store is None:
+            return []
+        
+        events = []
+        for row in self.cycle_store.latest_by_date(tickers, start, end):
+            try:
+                event_date = datetime.fromisoformat(row['date'])
+            except ValueError:
+                continue
+            events.append({
+                "type": row['cycle_type'],
+                "name": row['cycle_name'] or row['cycle_type'],
+                "date": event_date,
+                "days_until": (event_date.date() - start).days,
+                "tickers": [row['ticker']],
+                "source": "webhook"
+            })
+        return events
     
-    def _is_opex_week(self, date: datetime) -> bool:
-        """Check if date is in OPEX week"""
-        if date.month not in [3, 6, 9, 12]:
-            return False
+    def _upcoming_cycles(self, now: datetime) -> List[Dict]:
+        """Upcoming cycle events within each type's window, sorted by date"""
+        calendar = self._get_calendar(now)
+        today = now.date()
+        cycles = []
+        
+        for cycle_type, (first, last) in self.UPCOMING_WINDOWS.items():
+            for event in calendar.events(today + timedelta(days=first), today + timedelta(days=last + 1), [cycle_type]):
+                cycles.append({**event, "days_until": (event['date'].date() - today).days})
         
-        third_friday = self._get_third_friday(date.year, date.month)
-        days_diff = abs((date - third_friday).days)
+        # Sort by date
+        cycles.sort(key=lambda x: x['date'])
         
-        return days_diff <= 3
+        return cycles
     
     def _calculate_warrant_proximity(self, price: float) -> float:
         """Calculate warrant proximity score (0-100)"""
@@ -387,6 +473,11 @@ class GMESpecialistCalculator:
         score = max(0, 100 - (percent_away * 2))
         return score
     
+    def _warrant_proximity_many(self, prices: np.ndarray) -> np.ndarray:
+        """_calculate_warrant_proximity for an array of prices"""
+        percent_away = (self.WARRANT_STRIKE - prices) / self.WARRANT_STRIKE * 100
+        return np.where(prices >= self.WARRANT_STRIKE, 100.0, np.maximum(0, 100 - (percent_away * 2)))
+    
     def _estimate_ftd_pressure(self, ticker: str, now: datetime) -> float:
         """Estimate FTD accumulation pressure (0-100)"""
         # TODO: Fetch real FTD data from SEC
@@ -405,6 +496,15 @@ class GMESpecialistCalculator:
         else:
             return 50.0
     
+    def _ftd_pressure_many(self, days: np.ndarray) -> np.ndarray:
+        """_estimate_ftd_pressure for an array of day ordinals"""
+        ftd_position = (days - self.ORIGIN_DATE.toordinal()) % 35
+        return np.select(
+            [ftd_position < 5, ftd_position < 10, ftd_position > 30],
+            [90.0, 70.0, 80.0],
+            50.0
+        )
+    
     def _estimate_gamma_exposure(self, ticker: str) -> float:
         """Estimate options gamma exposure (0-100)"""
         # TODO: Implement real gamma calculation from options chain
@@ -425,80 +525,96 @@ class GMESpecialistCalculator:
     
     def _get_active_cycles(self, now: datetime) -> List[Dict]:
         """Get currently active cycles"""
-        active = []
-        
-        # Check 214d pattern
-        days_from_origin = (now - self.ORIGIN_DATE).days
-        if self._is_214d_active(days_from_origin):
-            active.append({
-                "type": "214d_pattern",
-                "status": "ACTIVE NOW",
-                "name": "214-Day Accelerating Pattern"
-            })
-        
-        # Check T+35
-        ftd_position = days_from_origin % 35
-        if ftd_position == 0:
-            active.append({
-                "type": "ftd35",
-                "status": "ACTIVE NOW",
-                "name": "T+35 FTD Settlement"
-            })
-        
-        # Check 147-day
-        days_from_moass = (now - self.MOASS_2021).days
-        c147_position = days_from_moass % 147
-        if c147_position <= 3:
-            active.append({
-                "type": "147day",
-                "status": "ACTIVE NOW",
-                "name": "147-Day Major Cycle"
-            })
-        
-        # Check OPEX
-        if self._is_opex_week(now):
-            active.append({
-                "type": "opex",
+        calendar = self._get_calendar(now)
+        return [
+            {
+                "type": cycle_type,
                 "status": "ACTIVE NOW",
-                "name": "Quarterly OPEX"
-            })
-        
-        return active
+                "name": self.ACTIVE_CYCLE_NAMES[cycle_type]
+            }
+            for cycle_type in calendar.active_types(now.date())
+        ]
     
-    def _get_upcoming_convergences(self, now: datetime) -> List[Dict]:
+    def _get_upcoming_convergences(self, now: datetime, stored: Optional[List[Dict]] = None) -> List[Dict]:
         """Detect upcoming cycle convergences"""
-        convergences = []
-        
-        # Get all cycles
-        all_cycles = self.get_upcoming_cycles("GME")
-        
-        # Group by date (within 3-day window)
-        date_groups = {}
-        for cycle in all_cycles:
-            cycle_date = cycle['date']
-            date_key = cycle_date.strftime('%Y-%m-%d')
-            
-            # Find if any existing group is within 3 days
-            found_group = False
-            for group_key in list(date_groups.keys()):
-                group_date = datetime.strptime(group_key, '%Y-%m-%d')
-                if abs((cycle_date - group_date).days) <= 3:
-                    date_groups[group_key].append(cycle)
-                    found_group = True
-                    break
-            
-            if not found_group:
-                date_groups[date_key] = [cycle]
-        
-        # Find convergences (2+ cycles)
-        for date_key, cycles in date_groups.items():
-            if len(cycles) >= 2:
-                convergences.append({
-                    "date": date_key,
-                    "days_until": cycles[0]['days_until'],
-                    "cycle_count": len(cycles),
-                    "cycles": [c['name'] for c in cycles],
-                    "pressure": "MEGA" if len(cycles) >= 3 else "HIGH"
-                })
-        
-        return sorted(convergences, key=lambda x: x['days_until'])[:5]
+        events = self._upcoming_cycles(now)
+        if stored:
+            events += stored
+            events.sort(key=lambda e: e['date'])
+        return self.convergence_detector.detect(events, now.date(), limit=5)
+    
+    def _backtest_closes(self, prices: pd.DataFrame, ticker: str, start: date, end: date) -> pd.Series:
+        """Daily closes for ticker from a bulk history frame, start..end inclusive"""
+        if ticker not in prices.columns.get_level_values(0):
+            raise TickerUnavailable(f"{ticker}: no price history")
+        
+        closes = prices[ticker]['Close'].dropna()
+        index = pd.DatetimeIndex(closes.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        closes.index = index.normalize()
+        closes = closes[(closes.index >= pd.Timestamp(start)) & (closes.index <= pd.Timestamp(end))]
+        if closes.empty:
+            raise TickerUnavailable(f"{ticker}: no price history from {start} to {end}")
+        return closes
+    
+    def _score_days(self, ticker: str, closes: pd.Series, calendar: CycleCalendar) -> pd.DataFrame:
+        """Every component and the weighted probability for each day in closes"""
+        days = closes.index.values.astype("datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+        prices = closes.to_numpy(dtype=float)
+        count = len(days)
+        
+        scores = {
+            'cycle': self._cycle_convergence_many(days, calendar, ticker),
+            'warrant': self._warrant_proximity_many(prices) if ticker == "GME" else np.zeros(count),
+            'ftd': self._ftd_pressure_many(days),
+            # Placeholder estimates do not vary by day
+            'gamma': np.full(count, self._estimate_gamma_exposure(ticker)),
+            'short': np.full(count, self._estimate_short_pressure(ticker)),
+            'sentiment': np.full(count, self._estimate_sentiment(ticker))
+        }
+        weights = self._weights(ticker)
+        probability = sum(scores[name] * weight for name, weight in weights.items())
+        confidence = np.select(
+            [probability >= floor for floor, _ in self.CONFIDENCE_LEVELS],
+            [label for _, label in self.CONFIDENCE_LEVELS],
+            "LOW"
+        )
+        
+        return pd.DataFrame({
+            "close": prices,
+            "probability": probability,
+            "confidence": confidence,
+            "cycle_convergence": scores['cycle'],
+            "warrant_proximity": scores['warrant'],
+            "ftd_accumulation": scores['ftd'],
+            "options_gamma": scores['gamma'],
+            "short_interest": scores['short'],
+            "sentiment": scores['sentiment']
+        }, index=closes.index)
+    
+    def _backtest_series(self, ticker: str, frame: pd.DataFrame) -> Dict:
+        """Column lists and a summary for one backtest frame, rounded like calculate_probability"""
+        probability = frame['probability'].to_numpy()
+        peak = int(np.argmax(probability))
+        breakdown = {
+            name: np.round(frame[name].to_numpy(), 1).tolist()
+            for name in BREAKDOWN_COLUMNS
+        }
+        if ticker != "GME":
+            breakdown["warrant_proximity"] = None
+        
+        return {
+            "dates": np.datetime_as_string(frame.index.values, unit="D").tolist(),
+            "close": np.round(frame['close'].to_numpy(), 2).tolist(),
+            "probability": np.round(probability, 1).tolist(),
+            "confidence": frame['confidence'].tolist(),
+            "breakdown": breakdown,
+            "summary": {
+                "days": len(frame),
+                "mean_probability": round(float(probability.mean()), 1),
+                "max_probability": round(float(probability[peak]), 1),
+                "max_date": frame.index[peak].date().isoformat(),
+                "high_confidence_days": int((frame['confidence'] == "HIGH").sum())
+            }
+        }
@@ -3,46 +3,165 @@ Market Scanner - Find the next GME
 Scans entire market for squeeze candidates
 """
 
-from typing import List, Dict
+import asyncio
+import os
+import time
+from types import MappingProxyType
+from typing import AsyncIterator, List, Dict, Mapping, NamedTuple, Optional, Tuple
 from datetime import datetime
-import yfinance as yf
+import pandas as pd
+
+from app.calculators.scoring import ScoringEngine
+from app.utils.data_fetcher import DataFetcher
+from app.utils.metrics import metrics
+from app.utils.profiling import span
+from app.utils.score_index import ScoreIndex
+from app.utils.universe import ScanUniverse
+
+SCAN_DURATION = metrics.histogram(
+    "moass_scan_duration_seconds",
+    "Duration of completed market scans",
+    ["mode"],
+    buckets=(0.5, 1, 5, 10, 30, 60, 120, 300, 600)
+)
+SCAN_TICKERS = metrics.counter(
+    "moass_scan_tickers_total",
+    "Tickers handled by market scans, by outcome",
+    ["mode", "outcome"]
+)
+
+class ScanSnapshot(NamedTuple):
+    """Immutable ranking as of the last completed scan, best score first"""
+    results: Tuple[Dict, ...]
+    created_at: datetime
+    stats: Mapping
+    
+    def age_seconds(self) -> float:
+        return (datetime.now() - self.created_at).total_seconds()
+    
+    def top(self, limit: int = 10, min_score: float = 60.0) -> List[Dict]:
+        """Best `limit` results scoring at least min_score, O(limit)"""
+        top = []
+        for result in self.results:
+            if len(top) >= limit or result['score'] < min_score:
+                break
+            top.append(result)
+        return top
 
 class MarketScanner:
     
-    # Scan universe (top liquid stocks)
-    SCAN_UNIVERSE = [
-        # Add 100+ tickers here - for demo, using subset
-        "GME", "AMC", "BBBY", "CLOV", "WISH", "MVIS", "BB", "NOK",
-        "PLTR", "TSLA", "RIVN", "LCID", "PLUG", "NIO", "SOFI"
-    ]
+    # Scan inputs used when .info leaves them out
+    SCAN_DEFAULTS = {"short_pct": 0, "float_shares": 1e9, "avg_volume": 0, "shares_short": 0}
+    
+    # Parallel scan limits
+    SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", 8))
+    SCAN_TICKER_TIMEOUT = float(os.getenv("SCAN_TICKER_TIMEOUT", 10))
+    SCAN_DEADLINE = float(os.getenv("SCAN_DEADLINE", 60))
     
-    def __init__(self):
+    def __init__(self, data_fetcher: Optional[DataFetcher] = None, universe: Optional[ScanUniverse] = None):
+        self.data_fetcher = data_fetcher or DataFetcher()
+        self.universe = universe or ScanUniverse.load()
+        self.skipped = 0  # Tickers left out of the last scan for backing off
+        self.engine = ScoringEngine()
         self.scan_results = []
         self.last_scan = None
+        self.last_scan_stats = {}
+        self.snapshot = None
+        self.index = ScoreIndex()
+        self._listeners = set()  # asyncio.Queue per streaming client
     
     def scan_market(self, limit: int = 10, min_score: float = 60.0) -> List[Dict]:
         """
         Scan market for squeeze candidates
         Returns top N results above min_score
         """
-        results = []
+        started = time.monotonic()
+        with span("scan.prefilter"):
+            universe = self._scan_tickers(min_score)
+        with span("scan.fetch_info"):
+            infos = self.data_fetcher.get_bulk_info(universe)
         
-        for ticker in self.SCAN_UNIVERSE:
-            try:
-                score_data = self._analyze_ticker_for_scan(ticker)
-                if score_data['score'] >= min_score:
-                    results.append(score_data)
-            except:
-                continue
+        with span("scan.build_frame"):
+            frame = self._build_scan_frame(universe, infos)
+        self.last_scan_stats = self._scan_stats("batch", universe, infos, started)
+        return self._finalize_scan(self._score_frame(frame), limit, min_score)
+    
+    async def scan_market_async(self, limit: int = 10, min_score: float = 60.0) -> List[Dict]:
+        """Non-blocking scan_market"""
+        started = time.monotonic()
+        with span("scan.prefilter"):
+            universe = self._scan_tickers(min_score)
+        with span("scan.fetch_info"):
+            infos = await self.data_fetcher.get_bulk_info_async(universe)
         
-        # Sort by score descending
-        results.sort(key=lambda x: x['score'], reverse=True)
+        with span("scan.build_frame"):
+            frame = self._build_scan_frame(universe, infos)
+        self.last_scan_stats = self._scan_stats("batch", universe, infos, started)
+        return self._finalize_scan(self._score_frame(frame), limit, min_score)
+    
+    async def scan_market_parallel(
+        self,
+        limit: int = 10,
+        min_score: float = 60.0,
+        concurrency: Optional[int] = None,
+        ticker_timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Per-ticker scan with bounded parallelism
+        Each ticker gets ticker_timeout seconds; after deadline seconds the
+        scan returns whatever finished and leaves the rest unscored
+        """
+        started = time.monotonic()
+        with span("scan.prefilter"):
+            universe = self._scan_tickers(min_score)
+        outcomes = {}
         
-        self.scan_results = results[:limit]
-        self.last_scan = datetime.now()
+        # Tickers are scored and indexed as they arrive, so listeners see
+        # results while the scan runs. Failed tickers score as empty, timed
+        # out / unfinished are left out
+        with span("scan.fetch"):
+            async for ticker, info, status in self._iter_infos_parallel(
+                universe,
+                concurrency or self.SCAN_CONCURRENCY,
+                ticker_timeout or self.SCAN_TICKER_TIMEOUT,
+                deadline or self.SCAN_DEADLINE
+            ):
+                outcomes[ticker] = status
+                if status in ("completed", "failed"):
+                    analysis = self._score_info(ticker, info) if info else self._empty_analysis(ticker)
+                    self.index.update(analysis)
+                    self._notify({"event": "result", "data": analysis})
         
+        self.last_scan_stats = self._parallel_stats(universe, outcomes, started)
+        with span("scan.index"):
+            self._publish_snapshot()
+        self.scan_results = self.top_candidates(limit, min_score)
         return self.scan_results
     
+    def listen(self) -> asyncio.Queue:
+        """
+        Queue receiving scan events on the event loop: a result event per
+        ticker as scans score it, then done with the scan stats
+        """
+        queue = asyncio.Queue()
+        self._listeners.add(queue)
+        return queue
+    
+    def unlisten(self, queue: asyncio.Queue):
+        self._listeners.discard(queue)
+    
+    def top_candidates(self, limit: int = 10, min_score: float = 60.0) -> List[Dict]:
+        """Top results from the score index, O(limit)"""
+        return self.index.top(limit, min_score)
+    
+    def cached_analysis(self, ticker: str) -> Optional[Dict]:
+        """Detailed analysis from the score index, None if never scored"""
+        analysis = self.index.get(ticker)
+        if analysis is None:
+            return None
+        return self._add_gme_comparison(dict(analysis))
+    
     def analyze_ticker(self, ticker: str) -> Dict:
         """
         Detailed analysis of single ticker
@@ -50,6 +169,13 @@ class MarketScanner:
         """
         return self._analyze_ticker_detailed(ticker)
     
+    async def analyze_ticker_async(self, ticker: str) -> Dict:
+        """Non-blocking analyze_ticker, re-ranks the ticker if it is indexed"""
+        analysis = await self._analyze_ticker_for_scan_async(ticker)
+        if ticker in self.index:
+            self.index.update(analysis)
+        return self._add_gme_comparison(dict(analysis))
+    
     def refresh_scan(self):
         """Trigger full market rescan"""
         return self.scan_market(limit=50, min_score=50.0)
@@ -58,64 +184,223 @@ class MarketScanner:
     # PRIVATE METHODS
     # ==========================================
     
+    def _finalize_scan(self, scored: pd.DataFrame, limit: int, min_score: float) -> List[Dict]:
+        """Fold scored tickers into the index, publish a snapshot and return the top N"""
+        with span("scan.index"):
+            analyses = [self._to_analysis(ticker, row) for ticker, row in scored.iterrows()]
+            self.index.update_many(analyses)
+            if self._listeners:
+                for analysis in analyses:
+                    self._notify({"event": "result", "data": analysis})
+            self._publish_snapshot()
+        
+        self.scan_results = self.top_candidates(limit, min_score)
+        return self.scan_results
+    
+    def _publish_snapshot(self):
+        """Freeze the current index ranking as the latest snapshot"""
+        stats = self.last_scan_stats
+        if stats:
+            SCAN_DURATION.observe(stats["duration_seconds"], mode=stats["mode"])
+            for outcome in ("completed", "failed", "timed_out", "unfinished", "skipped"):
+                SCAN_TICKERS.inc(stats[outcome], mode=stats["mode"], outcome=outcome)
+        
+        self.last_scan = datetime.now()
+        self.snapshot = ScanSnapshot(
+            results=self.index.ranked(),
+            created_at=self.last_scan,
+            stats=MappingProxyType(dict(self.last_scan_stats))
+        )
+        self._notify({"event": "done", "data": dict(self.last_scan_stats)})
+    
+    def _notify(self, event: Dict):
+        for queue in list(self._listeners):
+            queue.put_nowait(event)
+    
+    async def _iter_infos_parallel(
+        self,
+        tickers: List[str],
+        concurrency: int,
+        ticker_timeout: float,
+        deadline: float
+    ) -> AsyncIterator[Tuple[str, Optional[Dict], str]]:
+        """
+        Yield (ticker, info, status) as each per-ticker fetch finishes
+        status is completed, failed or timed_out; fetches still running at
+        the deadline are cancelled and never yielded
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(ticker):
+            async with semaphore:
+                try:
+                    info = await asyncio.wait_for(
+                        self.data_fetcher.get_info_async(ticker), ticker_timeout
+                    )
+                    return (ticker, info, "completed") if info else (ticker, None, "failed")
+                except asyncio.TimeoutError:
+                    return ticker, None, "timed_out"
+                except Exception:
+                    return ticker, None, "failed"
+        
+        pending = {asyncio.create_task(fetch(t)) for t in tickers}
+        stop_at = time.monotonic() + deadline
+        try:
+            while pending:
+                remaining = stop_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    def _scan_tickers(self, min_score: float) -> List[str]:
+        """
+        Universe tickers that pass the static pre-filter for min_score,
+        minus tickers backing off after failed fetches. Quarantined tickers
+        are dropped from the ranking so stale results do not linger
+        """
+        failures = self.data_fetcher.failures
+        tickers = []
+        self.skipped = 0
+        for ticker in self.universe.prefilter(min_score, self.engine):
+            if failures.should_skip(ticker):
+                self.skipped += 1
+                if failures.is_quarantined(ticker):
+                    self.index.remove(ticker)
+                continue
+            tickers.append(ticker)
+        return tickers
+    
+    def _scan_stats(self, mode: str, universe: List[str], infos: Dict, started: float) -> Dict:
+        """Summary of how a scan went"""
+        return {
+            "mode": mode,
+            "universe": len(self.universe),
+            "scanned": len(universe),
+            "skipped": self.skipped,
+            "completed": len(infos),
+            "failed": len(universe) - len(infos),
+            "timed_out": 0,
+            "unfinished": 0,
+            "duration_seconds": round(time.monotonic() - started, 3)
+        }
+    
+    def _parallel_stats(self, universe: List[str], outcomes: Dict[str, str], started: float) -> Dict:
+        """Scan stats from per-ticker outcomes of a parallel scan"""
+        stats = self._scan_stats("parallel", universe, {}, started)
+        counts = list(outcomes.values())
+        stats.update({
+            "completed": counts.count("completed"),
+            "failed": counts.count("failed"),
+            "timed_out": counts.count("timed_out"),
+            "unfinished": len(universe) - len(outcomes)
+        })
+        return stats
+    
     def _analyze_ticker_for_scan(self, ticker: str) -> Dict:
         """Quick analysis for scanner"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
-            # Get metrics
-            short_pct = info.get('shortPercentOfFloat', 0) * 100 if info.get('shortPercentOfFloat') else 0
-            float_shares = info.get('floatShares', 1e9)
-            avg_volume = info.get('averageVolume', 0)
-            shares_short = info.get('sharesShort', 0)
-            
-            # Calculate score components
-            si_score = min(100, short_pct * 2.5)  # Max at 40% SI
-            float_score = 100 if float_shares < 50e6 else 50 if float_shares < 100e6 else 25
-            dtc = shares_short / avg_volume if avg_volume > 0 else 0
-            dtc_score = min(100, dtc * 20)  # Max at 5 DTC
-            
-            # Overall score
-            score = (si_score * 0.5) + (float_score * 0.25) + (dtc_score * 0.25)
-            
-            # GME similarity (simple heuristic)
-            gme_similarity = min(100, short_pct * 1.5 + float_score * 0.3)
-            
-            # Generate alerts
-            alerts = []
-            if short_pct > 30:
-                alerts.append(f"SI: {short_pct:.1f}% - EXTREMELY HIGH")
-            if float_shares < 50e6:
-                alerts.append(f"Float: {float_shares/1e6:.1f}M - VERY LOW")
-            if dtc > 3:
-                alerts.append(f"Days to Cover: {dtc:.1f} - HIGH")
-            
-            return {
-                "ticker": ticker,
-                "score": round(score, 1),
-                "gme_similarity": round(gme_similarity, 1),
-                "metrics": {
-                    "short_interest": round(short_pct, 1),
-                    "float": float_shares,
-                    "days_to_cover": round(dtc, 2),
-                    "avg_volume": avg_volume
-                },
-                "alerts": alerts
-            }
-        except:
-            return {
-                "ticker": ticker,
-                "score": 0,
-                "gme_similarity": 0,
-                "metrics": {},
-                "alerts": []
-            }
+            return self._score_info(ticker, self.data_fetcher.get_info(ticker))
+        except Exception:
+            return self._empty_analysis(ticker)
+    
+    async def _analyze_ticker_for_scan_async(self, ticker: str) -> Dict:
+        """Non-blocking _analyze_ticker_for_scan"""
+        try:
+            return self._score_info(ticker, await self.data_fetcher.get_info_async(ticker))
+        except Exception:
+            return self._empty_analysis(ticker)
+    
+    def _build_scan_frame(self, tickers: List[str], infos: Dict[str, Dict]) -> pd.DataFrame:
+        """
+        One row per ticker with every input the scan scores on
+        Tickers without fundamentals are kept with available=False
+        """
+        frame = pd.DataFrame(
+            [self._info_to_row(infos[t]) if t in infos else {} for t in tickers],
+            index=pd.Index(tickers, name="ticker"),
+            columns=["short_pct", "float_shares", "avg_volume", "shares_short"]
+        )
+        frame["available"] = [t in infos for t in tickers]
+        return frame.fillna(self.SCAN_DEFAULTS)
+    
+    def _score_frame(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Score every row of a scan frame in one vectorized pass"""
+        with span("scan.score"):
+            scored = frame.join(self.engine.score_scan(frame))
+            scored.loc[~scored['available'], ['score', 'gme_similarity']] = 0
+        return scored
+    
+    def _info_to_row(self, info: Dict) -> Dict:
+        """Extract scan inputs from .info"""
+        return {
+            "short_pct": info.get('shortPercentOfFloat', 0) * 100 if info.get('shortPercentOfFloat') else 0,
+            "float_shares": info.get('floatShares', 1e9),
+            "avg_volume": info.get('averageVolume', 0),
+            "shares_short": info.get('sharesShort', 0)
+        }
+    
+    def _score_info(self, ticker: str, info: Dict) -> Dict:
+        """Score a ticker from its .info (scalar path, same scores as _score_frame)"""
+        row = {
+            column: self.SCAN_DEFAULTS[column] if value is None or value != value else value
+            for column, value in self._info_to_row(info).items()
+        }
+        row.update(self.engine.score_scan_one(row), available=True)
+        return self._to_analysis(ticker, row)
+    
+    def _to_analysis(self, ticker: str, row: Mapping) -> Dict:
+        """Scan result payload for one scored row"""
+        if not row['available']:
+            return self._empty_analysis(ticker)
+        
+        short_pct = float(row['short_pct'])
+        float_shares = float(row['float_shares'])
+        dtc = float(row['days_to_cover'])
+        
+        # Generate alerts
+        alerts = []
+        if short_pct > 30:
+            alerts.append(f"SI: {short_pct:.1f}% - EXTREMELY HIGH")
+        if float_shares < 50e6:
+            alerts.append(f"Float: {float_shares/1e6:.1f}M - VERY LOW")
+        if dtc > 3:
+            alerts.append(f"Days to Cover: {dtc:.1f} - HIGH")
+        
+        return {
+            "ticker": ticker,
+            "score": float(row['score']),
+            "gme_similarity": float(row['gme_similarity']),
+            "metrics": {
+                "short_interest": round(short_pct, 1),
+                "float": float_shares,
+                "days_to_cover": round(dtc, 2),
+                "avg_volume": float(row['avg_volume'])
+            },
+            "alerts": alerts
+        }
+    
+    def _empty_analysis(self, ticker: str) -> Dict:
+        """Zeroed analysis for tickers that fail to fetch"""
+        return {
+            "ticker": ticker,
+            "score": 0,
+            "gme_similarity": 0,
+            "metrics": {},
+            "alerts": []
+        }
     
     def _analyze_ticker_detailed(self, ticker: str) -> Dict:
         """Detailed analysis with GME comparison"""
-        quick_analysis = self._analyze_ticker_for_scan(ticker)
-        
+        return self._add_gme_comparison(self._analyze_ticker_for_scan(ticker))
+    
+    def _add_gme_comparison(self, quick_analysis: Dict) -> Dict:
+        """Attach GME pre-squeeze comparison to a quick analysis"""
         # Add more detailed metrics
         quick_analysis['gme_comparison'] = {
             "setup_similarity": quick_analysis['gme_similarity'],
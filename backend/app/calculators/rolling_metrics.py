@@ -0,0 +1,164 @@
+"""
+Rolling Metrics - Incrementally maintained squeeze metrics per ticker
+Each new bar or short-interest print updates running windows in O(1), so
+reading volume_ratio, price_change_30d or days_to_cover never rescans history
+"""
+
+import threading
+from collections import deque
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+class _TickerWindow:
+    """Running state for one ticker"""
+
+    __slots__ = (
+        "closes", "volumes", "volume_sum", "last_day",
+        "short_pct", "shares_short", "float_shares", "avg_volume"
+    )
+
+    def __init__(self):
+        self.closes = deque()  # (day, close) inside the price window
+        self.volumes = deque()  # (day, volume) for the last VOLUME_SESSIONS bars
+        self.volume_sum = 0.0
+        self.last_day = None
+        self.short_pct = 0.0
+        self.shares_short = 0.0
+        self.float_shares = 1.0
+        self.avg_volume = 0.0
+
+class RollingMetricsEngine:
+
+    # Sessions averaged for volume_ratio
+    VOLUME_SESSIONS = 5
+
+    # Lookback for price_change_30d (matches the 3mo history it replaced)
+    PRICE_WINDOW = pd.DateOffset(months=3)
+
+    def __init__(self):
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._windows
+
+    def on_bar(self, ticker: str, day: date, close: float, volume: float):
+        """
+        Add a daily bar. A bar for the newest day replaces it (partial
+        session update); bars older than that are ignored
+        """
+        with self._lock:
+            self._on_bar_locked(self._window(ticker), day, close, volume)
+
+    def on_short_interest(self, ticker: str, info: Dict):
+        """Take short interest, float and average volume from a .info print"""
+        short_pct = info.get('shortPercentOfFloat')
+        with self._lock:
+            w = self._window(ticker)
+            w.short_pct = short_pct * 100 if short_pct else 0.0
+            w.shares_short = float(info.get('sharesShort') or 0)
+            w.float_shares = float(info.get('floatShares') or 1)
+            w.avg_volume = float(info.get('averageVolume') or 0)
+
+    def sync_from_store(self, ticker: str, store) -> int:
+        """
+        Feed bars from a HistoryStore that this engine has not seen yet,
+        starting at the newest seen day in case it was rewritten
+        """
+        records = store.records(ticker)
+        if not len(records):
+            return 0
+
+        w = self._windows.get(ticker)
+        if w is not None and w.last_day is not None:
+            start = np.datetime64(w.last_day, "D")
+        else:
+            start = np.datetime64(self._cutoff(datetime.now()), "D")
+        first = int(np.searchsorted(records['date'], start, side="left"))
+
+        new = records[first:]
+        days = new['date'].astype(object)
+        with self._lock:
+            w = self._window(ticker)
+            for day, close, volume in zip(days, new['close'].tolist(), new['volume'].tolist()):
+                self._on_bar_locked(w, day, close, volume)
+        return len(new)
+
+    def metrics(self, ticker: str, as_of: Optional[datetime] = None) -> Optional[Dict]:
+        """Current squeeze metrics, or None if no bars fall in the window"""
+        cutoff = self._cutoff(as_of or datetime.now())
+        with self._lock:
+            w = self._windows.get(ticker)
+            if w is None:
+                return None
+
+            # Drop bars that aged out of the window
+            while w.closes and w.closes[0][0] < cutoff:
+                w.closes.popleft()
+            while w.volumes and w.volumes[0][0] < cutoff:
+                w.volume_sum -= w.volumes.popleft()[1]
+            if not w.closes:
+                return None
+
+            current_price = w.closes[-1][1]
+            price_30d_ago = w.closes[0][1]
+            recent_volume = w.volume_sum / len(w.volumes) if w.volumes else 0.0
+
+            return {
+                "short_interest": w.short_pct,
+                "shares_short": w.shares_short,
+                "float_shares": w.float_shares,
+                "days_to_cover": w.shares_short / w.avg_volume if w.avg_volume > 0 else 0.0,
+                "borrow_rate": 0.0,  # TODO: Fetch from external source
+                "ftd_volume": 0.0,  # TODO: Fetch from SEC
+                "gamma_exposure": 0.0,  # TODO: Calculate from options chain
+                "volume_ratio": recent_volume / w.avg_volume if w.avg_volume > 0 else 1.0,
+                "price_change_30d": (
+                    (current_price - price_30d_ago) / price_30d_ago * 100 if price_30d_ago > 0 else 0.0
+                ),
+                "current_price": current_price
+            }
+
+    def metrics_many(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Metrics for every ticker that has bars in the window"""
+        found = {}
+        for ticker in tickers:
+            metrics = self.metrics(ticker)
+            if metrics is not None:
+                found[ticker] = metrics
+        return found
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _window(self, ticker: str) -> _TickerWindow:
+        w = self._windows.get(ticker)
+        if w is None:
+            w = self._windows[ticker] = _TickerWindow()
+        return w
+
+    def _cutoff(self, as_of: datetime) -> date:
+        return (pd.Timestamp(as_of).normalize() - self.PRICE_WINDOW).date()
+
+    def _on_bar_locked(self, w: _TickerWindow, day: date, close: float, volume: float):
+        if w.last_day is not None and day < w.last_day:
+            return
+
+        if day == w.last_day:
+            # Rewrite of the newest bar
+            if w.closes and w.closes[-1][0] == day:
+                w.closes.pop()
+            if w.volumes and w.volumes[-1][0] == day:
+                w.volume_sum -= w.volumes.pop()[1]
+
+        if not np.isnan(close):
+            w.closes.append((day, close))
+        if not np.isnan(volume):
+            w.volumes.append((day, volume))
+            w.volume_sum += volume
+            if len(w.volumes) > self.VOLUME_SESSIONS:
+                w.volume_sum -= w.volumes.popleft()[1]
+        w.last_day = day
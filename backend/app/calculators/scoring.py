@@ -0,0 +1,225 @@
+"""
+Scoring Engine - Vectorized squeeze scoring
+Scores a whole universe in one NumPy pass using bucket tables. Single
+tickers go through scalar twins of the same formulas, which skip the
+DataFrame setup and return identical scores
+"""
+
+import bisect
+import math
+from typing import Dict, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+class ScoringEngine:
+
+    # ==========================================
+    # BUCKET TABLES (bins are lower bounds, scores has one extra entry)
+    # ==========================================
+
+    # Universal mode
+    SHORT_INTEREST_BINS = [10, 15, 20, 30, 40]
+    SHORT_INTEREST_SCORES = [20, 40, 60, 75, 90, 100]
+    VOLUME_RATIO_BINS = [1.2, 1.5, 2.0, 3.0]
+    VOLUME_RATIO_SCORES = [20, 40, 60, 80, 100]
+    PRICE_CHANGE_BINS = [0, 5, 15, 30, 50]
+    PRICE_CHANGE_SCORES = [10, 30, 40, 60, 80, 100]
+    FTD_SCORE = 50.0  # TODO: Implement real FTD scoring
+    GAMMA_SCORE = 50.0  # TODO: Implement real gamma scoring
+
+    UNIVERSAL_WEIGHTS = {
+        'short': 0.30,
+        'ftd': 0.25,
+        'gamma': 0.20,
+        'volume': 0.15,
+        'price': 0.10
+    }
+
+    # Scanner mode
+    FLOAT_BINS = [50e6, 100e6]
+    FLOAT_SCORES = [100, 50, 25]
+
+    SCAN_WEIGHTS = {
+        'si': 0.50,
+        'float': 0.25,
+        'dtc': 0.25
+    }
+
+    @staticmethod
+    def bucket(values, bins: Sequence[float], scores: Sequence[float]):
+        """Map values onto bucket scores, value >= bins[i] earns scores[i + 1]"""
+        values = np.nan_to_num(np.asarray(values, dtype=float))
+        return np.asarray(scores, dtype=float)[np.digitize(values, bins)]
+
+    @staticmethod
+    def bucket_one(value: float, bins: Sequence[float], scores: Sequence[float]) -> float:
+        """bucket for a single value"""
+        return float(scores[bisect.bisect_right(bins, _clean(value))])
+
+    @staticmethod
+    def confidence(probability):
+        """HIGH / MODERATE / LOW label(s) for probability"""
+        return np.select(
+            [np.asarray(probability) >= 70, np.asarray(probability) >= 50],
+            ["HIGH", "MODERATE"],
+            default="LOW"
+        )
+
+    @staticmethod
+    def confidence_one(probability: float) -> str:
+        """confidence for a single probability"""
+        if probability >= 70:
+            return "HIGH"
+        if probability >= 50:
+            return "MODERATE"
+        return "LOW"
+
+    def score_universal(self, metrics: pd.DataFrame) -> pd.DataFrame:
+        """
+        Component scores and probability for many tickers
+        metrics needs short_interest, volume_ratio, price_change_30d columns
+        """
+        w = self.UNIVERSAL_WEIGHTS
+        n = len(metrics)
+
+        short = self.bucket(metrics['short_interest'], self.SHORT_INTEREST_BINS, self.SHORT_INTEREST_SCORES)
+        volume = self.bucket(metrics['volume_ratio'], self.VOLUME_RATIO_BINS, self.VOLUME_RATIO_SCORES)
+        price = self.bucket(metrics['price_change_30d'], self.PRICE_CHANGE_BINS, self.PRICE_CHANGE_SCORES)
+        ftd = np.full(n, self.FTD_SCORE)
+        gamma = np.full(n, self.GAMMA_SCORE)
+
+        probability = (
+            short * w['short'] +
+            ftd * w['ftd'] +
+            gamma * w['gamma'] +
+            volume * w['volume'] +
+            price * w['price']
+        )
+
+        return pd.DataFrame({
+            "short_interest": short,
+            "ftd_accumulation": ftd,
+            "options_gamma": gamma,
+            "volume_volatility": volume,
+            "price_action": price,
+            "probability": probability,
+            "confidence": self.confidence(probability)
+        }, index=metrics.index)
+
+    def score_universal_one(self, metrics: Mapping) -> Dict:
+        """score_universal for one ticker's metrics"""
+        w = self.UNIVERSAL_WEIGHTS
+
+        short = self.bucket_one(metrics['short_interest'], self.SHORT_INTEREST_BINS, self.SHORT_INTEREST_SCORES)
+        volume = self.bucket_one(metrics['volume_ratio'], self.VOLUME_RATIO_BINS, self.VOLUME_RATIO_SCORES)
+        price = self.bucket_one(metrics['price_change_30d'], self.PRICE_CHANGE_BINS, self.PRICE_CHANGE_SCORES)
+
+        probability = (
+            short * w['short'] +
+            self.FTD_SCORE * w['ftd'] +
+            self.GAMMA_SCORE * w['gamma'] +
+            volume * w['volume'] +
+            price * w['price']
+        )
+
+        return {
+            "short_interest": short,
+            "ftd_accumulation": self.FTD_SCORE,
+            "options_gamma": self.GAMMA_SCORE,
+            "volume_volatility": volume,
+            "price_action": price,
+            "probability": probability,
+            "confidence": self.confidence_one(probability)
+        }
+
+    def score_scan(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Scanner score and GME similarity for many tickers
+        frame needs short_pct, float_shares, avg_volume, shares_short columns
+        """
+        w = self.SCAN_WEIGHTS
+
+        short_pct = np.nan_to_num(frame['short_pct'].to_numpy(dtype=float))
+        avg_volume = np.nan_to_num(frame['avg_volume'].to_numpy(dtype=float))
+        shares_short = np.nan_to_num(frame['shares_short'].to_numpy(dtype=float))
+
+        si_score = np.minimum(100, short_pct * 2.5)  # Max at 40% SI
+        float_score = self.bucket(frame['float_shares'], self.FLOAT_BINS, self.FLOAT_SCORES)
+        dtc = np.divide(shares_short, avg_volume, out=np.zeros_like(shares_short), where=avg_volume > 0)
+        dtc_score = np.minimum(100, dtc * 20)  # Max at 5 DTC
+
+        score = si_score * w['si'] + float_score * w['float'] + dtc_score * w['dtc']
+        gme_similarity = np.minimum(100, short_pct * 1.5 + float_score * 0.3)
+
+        return pd.DataFrame({
+            "si_score": si_score,
+            "float_score": float_score,
+            "days_to_cover": dtc,
+            "dtc_score": dtc_score,
+            "score": np.round(score, 1),
+            "gme_similarity": np.round(gme_similarity, 1)
+        }, index=frame.index)
+
+    def score_scan_one(self, row: Mapping) -> Dict:
+        """score_scan for one ticker's scan inputs"""
+        w = self.SCAN_WEIGHTS
+
+        short_pct = _clean(row['short_pct'])
+        avg_volume = _clean(row['avg_volume'])
+        shares_short = _clean(row['shares_short'])
+
+        si_score = min(100.0, short_pct * 2.5)
+        float_score = self.bucket_one(row['float_shares'], self.FLOAT_BINS, self.FLOAT_SCORES)
+        dtc = shares_short / avg_volume if avg_volume > 0 else 0.0
+        dtc_score = min(100.0, dtc * 20)
+
+        score = si_score * w['si'] + float_score * w['float'] + dtc_score * w['dtc']
+        gme_similarity = min(100.0, short_pct * 1.5 + float_score * 0.3)
+
+        return {
+            "si_score": si_score,
+            "float_score": float_score,
+            "days_to_cover": dtc,
+            "dtc_score": dtc_score,
+            "score": float(np.round(score, 1)),
+            "gme_similarity": float(np.round(gme_similarity, 1))
+        }
+
+    def max_scan_score(self, universe: pd.DataFrame, si_headroom: Optional[float] = None) -> np.ndarray:
+        """
+        Upper bound on score_scan from static attributes alone
+        universe has float_shares, avg_volume and last known short_interest
+        (NaN = unknown). Short interest can move arbitrarily before the next
+        fetch, so by default the SI and days-to-cover components are bounded
+        at 100 and only float size limits the score. With si_headroom set,
+        short interest is assumed to grow at most that much, which prunes
+        more but is a heuristic, not a bound. Unknown inputs bound their
+        component at 100
+        """
+        w = self.SCAN_WEIGHTS
+
+        float_shares = universe['float_shares'].to_numpy(dtype=float)
+        float_max = np.where(np.isnan(float_shares), 100, self.bucket(float_shares, self.FLOAT_BINS, self.FLOAT_SCORES))
+
+        if not si_headroom or si_headroom <= 0:
+            return 100 * w['si'] + float_max * w['float'] + 100 * w['dtc']
+
+        avg_volume = universe['avg_volume'].to_numpy(dtype=float)
+        short_pct = universe['short_interest'].to_numpy(dtype=float) * si_headroom
+
+        si_max = np.where(np.isnan(short_pct), 100, np.minimum(100, short_pct * 2.5))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dtc = short_pct / 100 * float_shares / avg_volume
+        dtc_max = np.where(np.isfinite(dtc), np.minimum(100, dtc * 20), 100)
+
+        return si_max * w['si'] + float_max * w['float'] + dtc_max * w['dtc']
+
+def _clean(value) -> float:
+    """Scalar np.nan_to_num: NaN/None -> 0, infinities -> largest finite float"""
+    value = float(value) if value is not None else 0.0
+    if math.isnan(value):
+        return 0.0
+    if math.isinf(value):
+        return math.copysign(np.finfo(float).max, value)
+    return value
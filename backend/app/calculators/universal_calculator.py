@@ -3,58 +3,85 @@ Universal Squeeze Calculator
 Works for ANY ticker - generic squeeze metrics
 """
 
+import asyncio
 from datetime import datetime
-from typing import Dict
-import yfinance as yf
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.calculators.rolling_metrics import RollingMetricsEngine
+from app.calculators.scoring import ScoringEngine
+from app.utils.data_fetcher import DataFetcher, TickerUnavailable
 
 class UniversalCalculator:
     
+    # Comparison matrix metrics -> rank ascending (smaller is more squeezable)
+    COMPARE_METRICS = {
+        "probability": False,
+        "short_interest": False,
+        "days_to_cover": False,
+        "volume_ratio": False,
+        "price_change_30d": False,
+        "shares_short": False,
+        "float_shares": True,
+        "current_price": False
+    }
+    
+    def __init__(self, data_fetcher: Optional[DataFetcher] = None):
+        self.data_fetcher = data_fetcher or DataFetcher()
+        self.engine = ScoringEngine()
+        self.rolling = RollingMetricsEngine()
+    
     def calculate_probability(self, ticker: str) -> Dict:
         """
         Calculate squeeze probability for any ticker
         Uses generic metrics: SI, FTDs, gamma, volume
         """
-        now = datetime.now()
-        
-        # Get metrics
-        metrics = self.get_metrics(ticker)
-        
-        # Calculate component scores
-        si_score = self._score_short_interest(metrics['short_interest'])
-        ftd_score = self._score_ftds(metrics['ftd_volume'])
-        gamma_score = self._score_gamma(metrics['gamma_exposure'])
-        volume_score = self._score_volume(metrics['volume_ratio'])
-        price_score = self._score_price_action(metrics['price_change_30d'])
-        
-        # Weighted probability
-        weights = {
-            'short': 0.30,
-            'ftd': 0.25,
-            'gamma': 0.20,
-            'volume': 0.15,
-            'price': 0.10
+        return self._build_probability(ticker, self.get_metrics(ticker))
+    
+    async def calculate_probability_async(self, ticker: str) -> Dict:
+        """Non-blocking calculate_probability"""
+        return self._build_probability(ticker, await self.get_metrics_async(ticker))
+    
+    async def calculate_probabilities_async(self, tickers: List[str]) -> Dict:
+        """
+        Probabilities for many tickers, fetched and scored together
+        Returns {"results": [...], "errors": {ticker: reason}}
+        """
+        metrics, errors = await self.get_metrics_many_async(tickers)
+        return {
+            "results": self._build_probabilities(metrics.to_dict(orient="index")) if len(metrics) else [],
+            "errors": errors
         }
+    
+    def _build_probability(self, ticker: str, metrics: Dict) -> Dict:
+        """Score already-fetched metrics (scalar path, no DataFrame)"""
+        return self._to_probability(ticker, self.engine.score_universal_one(metrics), datetime.now())
+    
+    def _build_probabilities(self, metrics_by_ticker: Dict[str, Dict]) -> List[Dict]:
+        """Score many tickers' metrics in one vectorized pass"""
+        now = datetime.now()
         
-        probability = (
-            si_score * weights['short'] +
-            ftd_score * weights['ftd'] +
-            gamma_score * weights['gamma'] +
-            volume_score * weights['volume'] +
-            price_score * weights['price']
-        )
-        
-        confidence = "HIGH" if probability >= 70 else "MODERATE" if probability >= 50 else "LOW"
+        frame = pd.DataFrame.from_dict(metrics_by_ticker, orient="index")
+        scores = self.engine.score_universal(frame)
         
+        return [
+            self._to_probability(ticker, row._asdict(), now)
+            for ticker, row in zip(metrics_by_ticker, scores.itertuples(index=False))
+        ]
+    
+    def _to_probability(self, ticker: str, scores: Dict, now: datetime) -> Dict:
+        """Probability payload from one ticker's component scores"""
         return {
             "ticker": ticker,
-            "probability": round(probability, 1),
-            "confidence": confidence,
+            "probability": round(float(scores['probability']), 1),
+            "confidence": str(scores['confidence']),
             "breakdown": {
-                "short_interest": round(si_score, 1),
-                "ftd_accumulation": round(ftd_score, 1),
-                "options_gamma": round(gamma_score, 1),
-                "volume_volatility": round(volume_score, 1),
-                "price_action": round(price_score, 1)
+                "short_interest": round(float(scores['short_interest']), 1),
+                "ftd_accumulation": round(float(scores['ftd_accumulation']), 1),
+                "options_gamma": round(float(scores['options_gamma']), 1),
+                "volume_volatility": round(float(scores['volume_volatility']), 1),
+                "price_action": round(float(scores['price_action']), 1)
             },
             "active_cycles": [],
             "upcoming_convergences": [],
@@ -64,49 +91,73 @@ class UniversalCalculator:
     def get_metrics(self, ticker: str) -> Dict:
         """Get raw squeeze metrics for ticker"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            hist = stock.history(period="3mo")
-            
-            # Extract metrics
-            short_pct = info.get('shortPercentOfFloat', 0) * 100 if info.get('shortPercentOfFloat') else 0
-            shares_short = info.get('sharesShort', 0)
-            float_shares = info.get('floatShares', 1)
-            avg_volume = info.get('averageVolume', 0)
-            current_price = hist['Close'].iloc[-1] if not hist.empty else 0
-            
-            # Calculate volume ratio
-            recent_volume = hist['Volume'].tail(5).mean() if not hist.empty else 0
-            volume_ratio = recent_volume / avg_volume if avg_volume > 0 else 1.0
-            
-            # Calculate 30-day price change
-            price_30d_ago = hist['Close'].iloc[0] if not hist.empty else current_price
-            price_change = ((current_price - price_30d_ago) / price_30d_ago * 100) if price_30d_ago > 0 else 0
-            
-            # Days to cover
-            dtc = (shares_short / avg_volume) if avg_volume > 0 else 0
-            
-            return {
-                "short_interest": short_pct,
-                "shares_short": shares_short,
-                "float_shares": float_shares,
-                "days_to_cover": dtc,
-                "borrow_rate": 0,  # TODO: Fetch from external source
-                "ftd_volume": 0,  # TODO: Fetch from SEC
-                "gamma_exposure": 0,  # TODO: Calculate from options chain
-                "volume_ratio": volume_ratio,
-                "price_change_30d": price_change,
-                "current_price": current_price
-            }
-        except:
+            info = self.data_fetcher.get_info(ticker)
+            self._sync_bars([ticker])
+            return self._rolling_metrics(ticker, info)
+        except Exception:
+            return self._default_metrics()
+    
+    async def get_metrics_async(self, ticker: str) -> Dict:
+        """Non-blocking get_metrics, fetches info and new bars concurrently"""
+        try:
+            info, _ = await asyncio.gather(
+                self.data_fetcher.get_info_async(ticker),
+                self.data_fetcher.run(self._sync_bars, [ticker])
+            )
+            return self._rolling_metrics(ticker, info)
+        except Exception:
             return self._default_metrics()
     
+    async def get_metrics_many_async(self, tickers: List[str]) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Metrics for many tickers, one info fetch each and new bars from the local store
+        Returns a metrics frame indexed by ticker and {ticker: error} for the rest
+        """
+        infos, _ = await asyncio.gather(
+            self.data_fetcher.get_bulk_info_async(tickers),
+            self.data_fetcher.run(self._sync_bars, tickers)
+        )
+        
+        for ticker, info in infos.items():
+            self.rolling.on_short_interest(ticker, info)
+        metrics = self.rolling.metrics_many([t for t in tickers if t in infos])
+        
+        errors = {t: "no data available" for t in tickers if t not in metrics}
+        frame = pd.DataFrame.from_dict(metrics, orient="index").reindex(columns=list(self._default_metrics()))
+        return frame, errors
+    
+    def _rolling_metrics(self, ticker: str, info: Dict) -> Dict:
+        """Push ticker's latest short-interest print and read its metrics"""
+        self.rolling.on_short_interest(ticker, info)
+        metrics = self.rolling.metrics(ticker)
+        if metrics is None:
+            raise TickerUnavailable(f"{ticker}: no recent history")
+        return metrics
+    
+    def _sync_bars(self, tickers: List[str]):
+        """Fetch new bars and push them into the rolling windows (blocking, reads the store)"""
+        self.data_fetcher.sync_history(tickers)
+        for ticker in tickers:
+            self.rolling.sync_from_store(ticker, self.data_fetcher.store)
+    
     def compare_tickers(self, ticker1: str, ticker2: str) -> Dict:
         """Compare squeeze metrics between two tickers"""
         metrics1 = self.get_metrics(ticker1)
         metrics2 = self.get_metrics(ticker2)
-        prob1 = self.calculate_probability(ticker1)
-        prob2 = self.calculate_probability(ticker2)
+        return self._build_comparison(ticker1, ticker2, metrics1, metrics2)
+    
+    async def compare_tickers_async(self, ticker1: str, ticker2: str) -> Dict:
+        """Non-blocking compare_tickers"""
+        metrics1, metrics2 = await asyncio.gather(
+            self.get_metrics_async(ticker1),
+            self.get_metrics_async(ticker2)
+        )
+        return self._build_comparison(ticker1, ticker2, metrics1, metrics2)
+    
+    def _build_comparison(self, ticker1: str, ticker2: str, metrics1: Dict, metrics2: Dict) -> Dict:
+        """Head-to-head comparison from already-fetched metrics"""
+        prob1 = self._build_probability(ticker1, metrics1)
+        prob2 = self._build_probability(ticker2, metrics2)
         
         return {
             "ticker1": ticker1,
@@ -130,62 +181,31 @@ class UniversalCalculator:
             }
         }
     
-    # ==========================================
-    # SCORING FUNCTIONS
-    # ==========================================
-    
-    def _score_short_interest(self, si_pct: float) -> float:
-        """Score short interest (0-100)"""
-        if si_pct >= 40:
-            return 100
-        elif si_pct >= 30:
-            return 90
-        elif si_pct >= 20:
-            return 75
-        elif si_pct >= 15:
-            return 60
-        elif si_pct >= 10:
-            return 40
-        else:
-            return 20
-    
-    def _score_ftds(self, ftd_volume: float) -> float:
-        """Score FTD accumulation (0-100)"""
-        # TODO: Implement real FTD scoring
-        return 50.0
-    
-    def _score_gamma(self, gamma_exposure: float) -> float:
-        """Score gamma exposure (0-100)"""
-        # TODO: Implement real gamma scoring
-        return 50.0
-    
-    def _score_volume(self, volume_ratio: float) -> float:
-        """Score volume increase (0-100)"""
-        if volume_ratio >= 3.0:
-            return 100
-        elif volume_ratio >= 2.0:
-            return 80
-        elif volume_ratio >= 1.5:
-            return 60
-        elif volume_ratio >= 1.2:
-            return 40
-        else:
-            return 20
-    
-    def _score_price_action(self, price_change: float) -> float:
-        """Score price momentum (0-100)"""
-        if price_change >= 50:
-            return 100
-        elif price_change >= 30:
-            return 80
-        elif price_change >= 15:
-            return 60
-        elif price_change >= 5:
-            return 40
-        elif price_change >= 0:
-            return 30
-        else:
-            return 10
+    async def compare_matrix_async(self, tickers: List[str]) -> Dict:
+        """
+        Metric-by-ticker matrix for any number of tickers, each fetched once
+        Every metric is ranked across tickers (1 = most squeezable)
+        """
+        metrics, errors = await self.get_metrics_many_async(tickers)
+        return self._build_matrix(metrics, errors)
+    
+    def _build_matrix(self, metrics: pd.DataFrame, errors: Dict[str, str]) -> Dict:
+        """Score and rank every metric in one pass"""
+        frame = metrics.assign(probability=self.engine.score_universal(metrics)['probability'])
+        frame = frame[list(self.COMPARE_METRICS)].astype(float).round(2)
+        
+        # Flip ascending metrics so one descending rank covers them all
+        signs = np.where(list(self.COMPARE_METRICS.values()), -1.0, 1.0)
+        ranks = (frame * signs).rank(ascending=False, method="min")
+        
+        return {
+            "tickers": frame.index.tolist(),
+            "metrics": list(self.COMPARE_METRICS),
+            "matrix": frame.to_dict(),
+            "ranks": ranks.astype(int).to_dict(),
+            "leaders": ranks.idxmin().to_dict() if len(frame) else {},
+            "errors": errors
+        }
     
     def _default_metrics(self) -> Dict:
         """Return default metrics if fetch fails"""
@@ -3,17 +3,27 @@ MOASS Terminal - Main FastAPI Application
 Never miss a squeeze again
 """
 
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+from fastapi import FastAPI, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from datetime import date
+from typing import Dict, Optional, List
+import json
 import os
 from dotenv import load_dotenv
 
 from app.calculators.gme_specialist import GMESpecialistCalculator
 from app.calculators.universal_calculator import UniversalCalculator
 from app.calculators.market_scanner import MarketScanner
-from app.utils.data_fetcher import DataFetcher
+from app.utils.broadcaster import Broadcaster
+from app.utils.cycle_store import CycleStore
+from app.utils.data_fetcher import DataFetcher, TickerUnavailable
+from app.utils.ingest import IngestPipeline, IngestQueueFull
+from app.utils.metrics import RequestMetricsMiddleware, metrics
+from app.utils.profiling import Profiler, ProfilingMiddleware
+from app.utils.scheduler import ScanScheduler
 
 load_dotenv()
 
@@ -33,12 +43,36 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestMetricsMiddleware)
 
-# Initialize calculators
-gme_calc = GMESpecialistCalculator()
-universal_calc = UniversalCalculator()
-scanner = MarketScanner()
+# Opt-in request profiling (PROFILE_TOKEN header or PROFILE_SAMPLE_RATE)
+profiler = Profiler()
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Initialize calculators (one shared fetcher = one bounded upstream pool)
 data_fetcher = DataFetcher()
+cycle_store = CycleStore()
+gme_calc = GMESpecialistCalculator(data_fetcher, cycle_store)
+universal_calc = UniversalCalculator(data_fetcher)
+scanner = MarketScanner(data_fetcher)
+scan_scheduler = ScanScheduler(scanner)
+cycle_ingest = IngestPipeline(gme_calc.update_cycle_data_batch)
+probability_push = Broadcaster(gme_calc.calculate_probability_async)
+
+COMPARE_MAX_TICKERS = int(os.getenv("COMPARE_MAX_TICKERS", 100))
+BATCH_MAX_TICKERS = int(os.getenv("BATCH_MAX_TICKERS", 500))
+
+@app.on_event("startup")
+async def start_background_jobs():
+    cycle_ingest.start()
+    if os.getenv("SCAN_SCHEDULER", "on") != "off":
+        scan_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await scan_scheduler.stop()
+    await probability_push.stop()
+    await cycle_ingest.stop()
 
 # ==========================================
 # MODELS
@@ -61,6 +95,13 @@ class ProbabilityResponse(BaseModel):
     upcoming_convergences: List[dict]
     timestamp: str
 
+class BatchProbabilityRequest(BaseModel):
+    tickers: List[str]
+
+class BatchProbabilityResponse(BaseModel):
+    results: List[ProbabilityResponse]
+    errors: Dict[str, str]
+
 class ScannerResult(BaseModel):
     ticker: str
     score: float
@@ -85,13 +126,72 @@ def root():
 @app.get("/health")
 def health():
     """Detailed health check"""
+    database = check_database()
+    cache = check_cache()
+    data_sources = check_data_sources()
+    healthy = database and cache and data_sources["status"] != "unavailable"
     return {
-        "status": "healthy",
-        "database": "connected" if check_database() else "disconnected",
-        "cache": "connected" if check_cache() else "disconnected",
-        "data_sources": check_data_sources()
+        "status": "healthy" if healthy else "degraded",
+        "database": "connected" if database else "disconnected",
+        "cache": "connected" if cache else "disconnected",
+        "cache_stats": data_fetcher.cache.stats(),
+        "data_sources": data_sources,
+        "backing_off": data_fetcher.failures.backing_off(),
+        "quarantine": data_fetcher.failures.quarantined(),
+        "cycle_ingest": cycle_ingest.stats()
     }
 
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus metrics: route and upstream latency, cache, scans, webhook queue"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/admin/profiles")
+async def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    """Recently captured request profiles, newest first"""
+    check_profile_token(x_profile_token)
+    return {"profiles": profiler.recent()}
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    limit: int = Query(30, ge=1, le=500, description="Functions listed from the call profile"),
+    x_profile_token: Optional[str] = Header(None)
+):
+    """Spans and heaviest functions for one captured request"""
+    check_profile_token(x_profile_token)
+    profile = profiler.profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No profile {profile_id}")
+    return profile.summary(limit)
+
+@metrics.collector
+def collect_runtime_metrics():
+    """Scrape-time readings of counters the components already keep"""
+    cache = data_fetcher.cache.stats()
+    yield ("moass_cache_hits_total", "counter", "Market data cache hits", {}, cache["hits"])
+    yield ("moass_cache_misses_total", "counter", "Market data cache misses", {}, cache["misses"])
+    yield ("moass_cache_coalesced_total", "counter", "Cache misses that joined an in-flight fetch", {}, cache["coalesced"])
+    yield ("moass_cache_hit_ratio", "gauge", "Cache hits / lookups since start", {}, cache["hit_ratio"])
+    yield ("moass_cache_entries", "gauge", "Entries held in the market data cache", {}, cache["entries"])
+    yield ("moass_cache_stale_served_total", "counter", "Expired entries served while upstream was unavailable", {}, cache["stale_served"])
+
+    for call, circuit in data_fetcher.provider.circuit_states().items():
+        labels = {"provider": data_fetcher.provider.name, "call": call}
+        yield ("moass_circuit_open", "gauge", "1 while a provider call's circuit is open or half-open", labels, int(circuit["state"] != "closed"))
+
+    ingest = cycle_ingest.stats()
+    yield ("moass_webhook_queue_depth", "gauge", "Cycle webhooks waiting to be stored", {}, ingest["queued"])
+    yield ("moass_webhook_queue_capacity", "gauge", "Cycle webhook queue size limit", {}, ingest["capacity"])
+    for outcome in ("accepted", "rejected", "processed", "failed"):
+        yield ("moass_webhook_events_total", "counter", "Cycle webhook events by outcome", {"outcome": outcome}, ingest[outcome])
+
+    yield ("moass_tickers_backing_off", "gauge", "Tickers skipped after failed fetches", {}, data_fetcher.failures.backing_off())
+    yield ("moass_tickers_quarantined", "gauge", "Tickers quarantined after repeated failures", {}, len(data_fetcher.failures.quarantined()))
+    if scanner.snapshot is not None:
+        yield ("moass_scan_snapshot_age_seconds", "gauge", "Age of the served scan ranking", {}, scanner.snapshot.age_seconds())
+    yield ("moass_push_subscribers", "gauge", "Open probability WebSocket subscriptions", {}, len(probability_push.subscriptions))
+
 # ==========================================
 # MODE 1: GME/AMC SPECIALIST
 # ==========================================
@@ -103,7 +203,7 @@ async def get_gme_probability():
     Uses 214d pattern, T+35, 147-day, warrants, etc.
     """
     try:
-        result = gme_calc.calculate_probability("GME")
+        result = await gme_calc.calculate_probability_async("GME")
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -114,11 +214,85 @@ async def get_amc_probability():
     Get AMC squeeze probability with specialist cycles
     """
     try:
-        result = gme_calc.calculate_probability("AMC")
+        result = await gme_calc.calculate_probability_async("AMC")
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.websocket("/ws/probability")
+async def probability_stream(websocket: WebSocket, tickers: str = "GME,AMC"):
+    """
+    Push GME/AMC probability and cycle updates
+    First a snapshot per ticker, then only changed fields each tick
+    """
+    symbols = {t.strip().upper() for t in tickers.split(",") if t.strip()}
+    if not symbols or not symbols <= {"GME", "AMC"}:
+        await websocket.close(code=1008, reason="Specialist mode only supports GME/AMC")
+        return
+    
+    await websocket.accept()
+    subscription = await probability_push.subscribe(symbols)
+    
+    async def send_updates():
+        while True:
+            await websocket.send_json(await subscription.queue.get(), mode="text")
+    
+    sender = asyncio.create_task(send_updates())
+    try:
+        # Nothing is expected from the client; this returns when it disconnects
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        probability_push.unsubscribe(subscription)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+
+@app.get("/api/specialist/convergences")
+async def get_specialist_convergences(
+    tickers: str = Query("GME,AMC", description="Comma-separated GME/AMC"),
+    days_ahead: int = Query(365, ge=1, le=3650),
+    window_days: int = Query(3, ge=0, le=30),
+    min_cycles: int = Query(2, ge=1, le=10),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """
+    Get cycle convergences across GME/AMC over a multi-year horizon
+    """
+    symbols = sorted({t.strip().upper() for t in tickers.split(",") if t.strip()})
+    if not symbols or any(t not in ["GME", "AMC"] for t in symbols):
+        raise HTTPException(status_code=400, detail="Specialist mode only supports GME/AMC")
+    
+    try:
+        convergences = await gme_calc.get_convergences_async(symbols, days_ahead, window_days, min_cycles, limit)
+        return {"tickers": symbols, "days_ahead": days_ahead, "convergences": convergences}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/specialist/backtest")
+async def get_specialist_backtest(
+    tickers: str = Query("GME,AMC", description="Comma-separated GME/AMC"),
+    start: date = Query(date(2021, 1, 1), description="First date (inclusive), YYYY-MM-DD"),
+    end: Optional[date] = Query(None, description="Last date (inclusive), YYYY-MM-DD; default today")
+):
+    """
+    Daily probability and component scores for every trading day in a range,
+    aligned with the historical closes
+    """
+    symbols = sorted({t.strip().upper() for t in tickers.split(",") if t.strip()})
+    if not symbols or any(t not in ["GME", "AMC"] for t in symbols):
+        raise HTTPException(status_code=400, detail="Specialist mode only supports GME/AMC")
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end is before start")
+    
+    try:
+        return await gme_calc.backtest_async(symbols, start, end)
+    except TickerUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/specialist/{ticker}/cycles")
 async def get_specialist_cycles(ticker: str):
     """
@@ -142,7 +316,7 @@ async def get_warrant_status(ticker: str):
         if ticker.upper() != "GME":
             raise HTTPException(status_code=400, detail="Warrants only available for GME")
         
-        warrant_data = gme_calc.get_warrant_status()
+        warrant_data = await gme_calc.get_warrant_status_async()
         return warrant_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -158,7 +332,7 @@ async def get_universal_probability(ticker: str):
     Uses generic squeeze metrics
     """
     try:
-        result = universal_calc.calculate_probability(ticker.upper())
+        result = await universal_calc.calculate_probability_async(ticker.upper())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -169,30 +343,81 @@ async def get_universal_metrics(ticker: str):
     Get detailed squeeze metrics for any ticker
     """
     try:
-        metrics = universal_calc.get_metrics(ticker.upper())
+        metrics = await universal_calc.get_metrics_async(ticker.upper())
         return {"ticker": ticker.upper(), "metrics": metrics}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/universal/probability/batch", response_model=BatchProbabilityResponse)
+async def get_universal_probability_batch(request: BatchProbabilityRequest):
+    """
+    Squeeze probability for many tickers in one request
+    Fetches are shared across the batch; tickers without data are listed
+    under errors instead of failing the whole batch
+    """
+    symbols = list(dict.fromkeys(t.strip().upper() for t in request.tickers if t.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No tickers given")
+    if len(symbols) > BATCH_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_TICKERS} tickers per batch")
+    
+    try:
+        return await universal_calc.calculate_probabilities_async(symbols)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ==========================================
 # MODE 3: MARKET SCANNER
 # ==========================================
 
 @app.get("/api/scanner/top", response_model=List[ScannerResult])
 async def get_top_candidates(
+    response: Response,
     limit: int = Query(10, ge=1, le=50),
     min_score: float = Query(60.0, ge=0, le=100)
 ):
     """
     Get top squeeze candidates from market scan
     Scans 5000+ stocks for GME-like setups
+    Served from the last completed scan's snapshot, kept fresh by background scans
     """
+    check_scan_min_score(min_score)
     try:
-        results = scanner.scan_market(limit=limit, min_score=min_score)
-        return results
+        if scanner.snapshot is None:
+            await scan_scheduler.refresh()
+        
+        snapshot = scanner.snapshot
+        response.headers["X-Snapshot-Age"] = f"{snapshot.age_seconds():.1f}"
+        return snapshot.top(limit=limit, min_score=min_score)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/scanner/stream")
+async def stream_top_candidates(
+    limit: int = Query(10, ge=1, le=50),
+    min_score: float = Query(60.0, ge=0, le=100),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    snapshot_interval: float = Query(1.0, gt=0, le=60)
+):
+    """
+    Stream scanner results as they are scored
+    Emits result events per ticker, periodic top-N snapshot events and a
+    final done event with scan stats, as NDJSON or Server-Sent Events.
+    Joins the scan already running, if any, rather than starting another
+    """
+    check_scan_min_score(min_score)
+    events = scan_scheduler.stream(limit=limit, min_score=min_score, snapshot_interval=snapshot_interval)
+    
+    async def body():
+        async for event in events:
+            if format == "sse":
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+            else:
+                yield json.dumps(event) + "\n"
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
 @app.get("/api/scanner/ticker/{ticker}")
 async def get_scanner_analysis(ticker: str):
     """
@@ -200,7 +425,12 @@ async def get_scanner_analysis(ticker: str):
     Compares to GME pre-squeeze setup
     """
     try:
-        analysis = scanner.analyze_ticker(ticker.upper())
+        analysis = scanner.cached_analysis(ticker.upper())
+        if analysis is not None and scanner.snapshot is not None:
+            analysis['snapshot_age_seconds'] = round(scanner.snapshot.age_seconds(), 1)
+            return analysis
+        
+        analysis = await scanner.analyze_ticker_async(ticker.upper())
         return analysis
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -208,14 +438,26 @@ async def get_scanner_analysis(ticker: str):
 @app.get("/api/scanner/refresh")
 async def refresh_scanner():
     """
-    Trigger manual scanner refresh (runs automatically daily)
+    Trigger manual scanner refresh (runs automatically every SCAN_INTERVAL_SECONDS)
     """
     try:
-        scanner.refresh_scan()
-        return {"status": "success", "message": "Scanner refresh initiated"}
+        scan_scheduler.trigger()
+        return {"status": "success", "message": "Scanner refresh initiated", "stats": scanner.last_scan_stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/scanner/status")
+async def get_scanner_status():
+    """
+    Last scan time and how many tickers completed, failed or timed out
+    """
+    return {
+        "last_scan": scanner.last_scan.isoformat() if scanner.last_scan else None,
+        "snapshot_age_seconds": round(scanner.snapshot.age_seconds(), 1) if scanner.snapshot else None,
+        "snapshot_size": len(scanner.snapshot.results) if scanner.snapshot else 0,
+        "stats": scanner.last_scan_stats
+    }
+
 # ==========================================
 # COMPARISON TOOLS
 # ==========================================
@@ -229,11 +471,29 @@ async def compare_tickers(
     Compare squeeze metrics between two tickers
     """
     try:
-        comparison = universal_calc.compare_tickers(ticker1.upper(), ticker2.upper())
+        comparison = await universal_calc.compare_tickers_async(ticker1.upper(), ticker2.upper())
         return comparison
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/compare/matrix")
+async def compare_matrix(
+    tickers: str = Query(..., description="Comma-separated tickers to compare")
+):
+    """
+    Compare any number of tickers: metric-by-ticker matrix with per-metric ranks
+    """
+    symbols = list(dict.fromkeys(t.strip().upper() for t in tickers.split(",") if t.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No tickers given")
+    if len(symbols) > COMPARE_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {COMPARE_MAX_TICKERS} tickers per comparison")
+    
+    try:
+        return await universal_calc.compare_matrix_async(symbols)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ==========================================
 # WEBHOOKS (from Pine Script)
 # ==========================================
@@ -242,18 +502,37 @@ async def compare_tickers(
 async def receive_cycle_webhook(data: CycleWebhook):
     """
     Receive cycle data from TradingView Pine Script indicators
-    Updates real-time cycle tracking
+    Queued for the background consumer; 429 when the queue is full
     """
+    ticker = data.ticker.upper()
     try:
-        # Store cycle data
-        gme_calc.update_cycle_data(data.dict())
-        
-        return {
-            "status": "received",
-            "ticker": data.ticker,
-            "cycle": data.cycle_type,
-            "message": f"Cycle data updated for {data.ticker}"
-        }
+        await cycle_ingest.submit({**data.dict(), "ticker": ticker})
+    except IngestQueueFull as e:
+        return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "status": "received",
+        "ticker": ticker,
+        "cycle": data.cycle_type,
+        "message": f"Cycle data queued for {ticker}"
+    }
+
+@app.get("/api/webhook/cycles")
+async def query_cycle_webhooks(
+    ticker: Optional[str] = None,
+    cycle_type: Optional[str] = None,
+    start: Optional[date] = Query(None, description="First date (inclusive), YYYY-MM-DD"),
+    end: Optional[date] = Query(None, description="Last date (exclusive), YYYY-MM-DD"),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Range scan over stored Pine Script cycle webhooks
+    """
+    try:
+        cycles = await data_fetcher.run(cycle_store.query, ticker, cycle_type, start, end, limit)
+        return {"count": len(cycles), "cycles": cycles}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -265,7 +544,7 @@ async def receive_cycle_webhook(data: CycleWebhook):
 async def get_current_price(ticker: str):
     """Get current price for ticker"""
     try:
-        price_data = data_fetcher.get_price(ticker.upper())
+        price_data = await data_fetcher.get_price_async(ticker.upper())
         return price_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -274,7 +553,7 @@ async def get_current_price(ticker: str):
 async def get_short_interest(ticker: str):
     """Get short interest data"""
     try:
-        si_data = data_fetcher.get_short_interest(ticker.upper())
+        si_data = await data_fetcher.get_short_interest_async(ticker.upper())
         return si_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -284,22 +563,33 @@ async def get_short_interest(ticker: str):
 # ==========================================
 
 def check_database():
-    """Check database connection"""
-    # TODO: Implement actual database check
-    return True
+    """Check the cycle webhook database answers"""
+    return cycle_store.ping()
 
 def check_cache():
-    """Check Redis cache connection"""
-    # TODO: Implement actual cache check
-    return True
+    """Check the in-process market data cache responds"""
+    try:
+        data_fetcher.cache.stats()
+        return True
+    except Exception:
+        return False
+
+def check_profile_token(token: Optional[str]):
+    """Admin profile routes need PROFILE_TOKEN"""
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=403, detail="Missing or invalid X-Profile-Token")
+
+def check_scan_min_score(min_score: float):
+    """Background scans skip tickers that cannot reach SCAN_MIN_SCORE, so lower thresholds would be incomplete"""
+    if min_score < scan_scheduler.MIN_SCORE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"min_score must be at least {scan_scheduler.MIN_SCORE:g} (SCAN_MIN_SCORE)"
+        )
 
 def check_data_sources():
-    """Check external data source availability"""
-    return {
-        "yahoo_finance": "available",
-        "finra": "available",
-        "sec": "available"
-    }
+    """Market data provider status from its most recent calls"""
+    return data_fetcher.provider_status()
 
 # ==========================================
 # ERROR HANDLERS
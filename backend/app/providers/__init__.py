@@ -0,0 +1,21 @@
+"""
+Market data providers
+DATA_PROVIDER selects the backend: yfinance (live, default) or replay
+(recorded fixtures, see app.providers.replay)
+"""
+
+import os
+from typing import Optional
+
+from app.providers.base import MarketDataProvider
+
+def get_provider(name: Optional[str] = None) -> MarketDataProvider:
+    """Provider named by DATA_PROVIDER"""
+    name = name or os.getenv("DATA_PROVIDER", "yfinance")
+    if name == "replay":
+        from app.providers.replay import ReplayProvider
+        return ReplayProvider()
+    if name == "yfinance":
+        from app.providers.yfinance_provider import YFinanceProvider
+        return YFinanceProvider()
+    raise ValueError(f"Unknown data provider: {name}")
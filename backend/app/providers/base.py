@@ -0,0 +1,34 @@
+"""
+Market Data Provider - Interface DataFetcher uses for all upstream data
+Implementations return raw data only; caching, batching, backoff and
+the history store stay in DataFetcher
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, List, Optional
+import pandas as pd
+
+class MarketDataProvider(ABC):
+
+    name = "base"
+
+    @abstractmethod
+    def info(self, ticker: str) -> Dict:
+        """Fundamentals in yfinance .info shape; empty dict if unknown"""
+
+    @abstractmethod
+    def history(self, ticker: str, period: str) -> pd.DataFrame:
+        """Daily OHLCV (Open/High/Low/Close/Volume) for period; empty if unknown"""
+
+    @abstractmethod
+    def bulk_history(
+        self,
+        tickers: List[str],
+        period: str,
+        start: Optional[date] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Daily OHLCV for many tickers, covering period or everything from start
+        Tickers without data are left out
+        """
@@ -0,0 +1,182 @@
+"""
+Replay Provider - Deterministic offline data from recorded fixtures
+Each ticker is a directory with info.json and history.csv:
+
+    <path>/GME/info.json
+    <path>/GME/history.csv   (Date, Open, High, Low, Close, Volume)
+
+History is re-dated onto consecutive weekdays ending at the most recent
+weekday, so today-relative windows see the same bars on any day and no
+bar falls on a weekend.
+Injected latency makes offline runs behave like a slow upstream.
+
+Record fixtures from the live provider with:
+    python -m app.providers.replay record GME AMC [--period 1y] [--path dir]
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+
+from app.providers.base import MarketDataProvider
+
+class ReplayProvider(MarketDataProvider):
+
+    name = "replay"
+
+    DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "replay"
+    PATH = os.getenv("REPLAY_PATH", str(DEFAULT_PATH))
+
+    # Injected delay per call, in seconds: LATENCY plus uniform [0, JITTER)
+    LATENCY = float(os.getenv("REPLAY_LATENCY", 0))
+    JITTER = float(os.getenv("REPLAY_JITTER", 0))
+    SEED = int(os.getenv("REPLAY_SEED", 0))
+
+    SHIFT_DATES = os.getenv("REPLAY_SHIFT_DATES", "on") != "off"
+
+    PERIODS = {
+        "1d": pd.DateOffset(days=0),  # Last bar only
+        "5d": pd.DateOffset(days=5),
+        "1mo": pd.DateOffset(months=1),
+        "3mo": pd.DateOffset(months=3),
+        "6mo": pd.DateOffset(months=6),
+        "1y": pd.DateOffset(years=1),
+        "2y": pd.DateOffset(years=2),
+        "5y": pd.DateOffset(years=5)
+    }
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        latency: Optional[float] = None,
+        jitter: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.root = Path(path or self.PATH)
+        self.latency = self.LATENCY if latency is None else latency
+        self.jitter = self.JITTER if jitter is None else jitter
+        self._random = random.Random(self.SEED if seed is None else seed)
+        self._random_lock = threading.Lock()
+        self._infos = {}
+        self._histories = {}
+
+    def tickers(self) -> List[str]:
+        """Tickers with recorded fixtures"""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def info(self, ticker: str) -> Dict:
+        self._delay()
+        if ticker not in self._infos:
+            path = self.root / ticker / "info.json"
+            self._infos[ticker] = json.loads(path.read_text()) if path.exists() else {}
+        return dict(self._infos[ticker])
+
+    def history(self, ticker: str, period: str) -> pd.DataFrame:
+        self._delay()
+        return self._slice(self._history(ticker), period, None)
+
+    def bulk_history(
+        self,
+        tickers: List[str],
+        period: str,
+        start: Optional[date] = None
+    ) -> Dict[str, pd.DataFrame]:
+        # One upstream round trip for the batch, like yf.download
+        self._delay()
+        frames = {}
+        for ticker in tickers:
+            hist = self._slice(self._history(ticker), period, start)
+            if not hist.empty:
+                frames[ticker] = hist
+        return frames
+
+    @classmethod
+    def record(
+        cls,
+        source: MarketDataProvider,
+        tickers: List[str],
+        period: str = "1y",
+        path: Optional[str] = None
+    ) -> List[str]:
+        """Write fixtures for tickers from another provider; returns those recorded"""
+        root = Path(path or cls.PATH)
+        recorded = []
+        for ticker in tickers:
+            info = source.info(ticker)
+            hist = source.history(ticker, period)
+            if not info or hist.empty:
+                continue
+
+            target = root / ticker
+            target.mkdir(parents=True, exist_ok=True)
+            (target / "info.json").write_text(json.dumps(info, indent=1, default=str))
+
+            index = hist.index.tz_localize(None) if getattr(hist.index, "tz", None) is not None else hist.index
+            hist = hist.set_axis(index.normalize().rename("Date"))
+            hist[["Open", "High", "Low", "Close", "Volume"]].to_csv(target / "history.csv")
+            recorded.append(ticker)
+        return recorded
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _delay(self):
+        delay = self.latency
+        if self.jitter > 0:
+            with self._random_lock:
+                delay += self._random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _history(self, ticker: str) -> pd.DataFrame:
+        if ticker not in self._histories:
+            path = self.root / ticker / "history.csv"
+            hist = pd.read_csv(path, index_col="Date", parse_dates=True) if path.exists() else pd.DataFrame()
+            if not hist.empty and self.SHIFT_DATES:
+                hist.index = pd.bdate_range(end=self._last_weekday(), periods=len(hist), name=hist.index.name)
+            self._histories[ticker] = hist
+        return self._histories[ticker]
+
+    def _slice(self, hist: pd.DataFrame, period: str, start: Optional[date]) -> pd.DataFrame:
+        if hist.empty:
+            return hist.copy()
+        if start is not None:
+            first = pd.Timestamp(start)
+        elif period in self.PERIODS:
+            first = hist.index[-1].normalize() - self.PERIODS[period]
+        else:  # "max" and anything unrecognised
+            return hist.copy()
+        return hist.loc[hist.index >= first].copy()
+
+    def _last_weekday(self) -> pd.Timestamp:
+        today = pd.Timestamp.today().normalize()
+        return today - pd.Timedelta(days=max(0, today.weekday() - 4))
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0] != "record" or len(args) < 2:
+        sys.exit("usage: python -m app.providers.replay record TICKER [TICKER ...] [--period 1y] [--path dir]")
+
+    options = {"--period": "1y", "--path": None}
+    tickers = []
+    rest = iter(args[1:])
+    for arg in rest:
+        if arg in options:
+            options[arg] = next(rest)
+        else:
+            tickers.append(arg.upper())
+
+    from app.providers.yfinance_provider import YFinanceProvider
+
+    done = ReplayProvider.record(YFinanceProvider(), tickers, options["--period"], options["--path"])
+    print(f"Recorded {len(done)}/{len(tickers)} tickers: {', '.join(done)}")
@@ -0,0 +1,191 @@
+"""
+Resilient Provider - Deadlines, circuit breakers and hedging around a provider
+Every call runs on a small pool so a hung upstream request cannot hold the
+caller past its deadline. Each call type (info, history, bulk_history) has
+its own circuit breaker. With hedging on, a slow info/history call gets one
+duplicate once it runs past the recent latency percentile; the first
+answer wins
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from typing import Callable, Dict, List, Optional
+import pandas as pd
+
+from app.providers.base import MarketDataProvider
+from app.utils.metrics import metrics
+from app.utils.resilience import TRANSPORT_ERRORS, CircuitBreaker, LatencyTracker, UpstreamTimeout
+
+UPSTREAM_TIMEOUTS = metrics.counter(
+    "moass_upstream_timeouts_total",
+    "Provider calls abandoned at their deadline",
+    ["provider", "call"]
+)
+UPSTREAM_REJECTED = metrics.counter(
+    "moass_upstream_circuit_rejections_total",
+    "Provider calls refused by an open circuit",
+    ["provider", "call"]
+)
+UPSTREAM_HEDGES = metrics.counter(
+    "moass_upstream_hedges_total",
+    "Hedged duplicate provider calls, by whether the hedge answered first",
+    ["provider", "call", "outcome"]
+)
+
+class ResilientProvider(MarketDataProvider):
+
+    # Per-call deadlines in seconds; 0 runs the call inline with no deadline
+    TIMEOUTS = {
+        "info": float(os.getenv("UPSTREAM_TIMEOUT", 10)),
+        "history": float(os.getenv("UPSTREAM_TIMEOUT", 10)),
+        "bulk_history": float(os.getenv("UPSTREAM_BULK_TIMEOUT", 60))
+    }
+
+    # Threads for upstream calls, including ones left running past their deadline
+    POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", 32))
+
+    # Hedge a call once it runs past this latency percentile (0 = no hedging)
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 0))
+
+    # Successful calls needed before the percentile is trusted
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+
+    # Hedges allowed per call made, so a slow upstream is not hit twice as hard
+    HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", 0.1))
+
+    # Single-ticker reads only; a duplicate bulk download costs too much
+    HEDGED_CALLS = {"info", "history"}
+
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        timeouts: Optional[Dict[str, float]] = None,
+        hedge_percentile: Optional[float] = None,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None
+    ):
+        self.provider = provider
+        self.name = provider.name
+        self.timeouts = {**self.TIMEOUTS, **(timeouts or {})}
+        self.hedge_percentile = self.HEDGE_PERCENTILE if hedge_percentile is None else hedge_percentile
+        self.breakers = breakers or {call: CircuitBreaker(f"{provider.name}.{call}") for call in self.TIMEOUTS}
+        self.latency = {call: LatencyTracker() for call in self.TIMEOUTS}
+        self.executor = ThreadPoolExecutor(max_workers=self.POOL_SIZE, thread_name_prefix="upstream")
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def info(self, ticker: str) -> Dict:
+        return self._call("info", self.provider.info, ticker)
+
+    def history(self, ticker: str, period: str) -> pd.DataFrame:
+        return self._call("history", self.provider.history, ticker, period)
+
+    def bulk_history(
+        self,
+        tickers: List[str],
+        period: str,
+        start: Optional[date] = None
+    ) -> Dict[str, pd.DataFrame]:
+        return self._call("bulk_history", self.provider.bulk_history, tickers, period, start)
+
+    def circuit_states(self) -> Dict[str, Dict]:
+        return {call: breaker.status() for call, breaker in self.breakers.items()}
+
+    def close(self, wait: bool = True):
+        """Shut down the upstream pool, dropping calls that have not started"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _call(self, call: str, fetch: Callable, *args):
+        labels = {"provider": self.name, "call": call}
+        breaker = self.breakers[call]
+        try:
+            breaker.before_call()
+        except Exception:
+            UPSTREAM_REJECTED.inc(**labels)
+            raise
+
+        with self._lock:
+            self.calls += 1
+        started = time.perf_counter()
+        try:
+            result = self._run(call, fetch, args)
+        except UpstreamTimeout as e:
+            UPSTREAM_TIMEOUTS.inc(**labels)
+            breaker.record_failure(str(e))
+            raise
+        except TRANSPORT_ERRORS as e:
+            breaker.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        except Exception:
+            # Upstream answered; the error is the ticker's (delisted, empty frame)
+            breaker.record_success()
+            raise
+
+        breaker.record_success()
+        self.latency[call].record(time.perf_counter() - started)
+        return result
+
+    def _run(self, call: str, fetch: Callable, args: tuple):
+        """Run fetch under the call's deadline, hedging if it is slow"""
+        timeout = self.timeouts.get(call, 0)
+        hedge_after = self._hedge_delay(call)
+        if timeout <= 0 and hedge_after is None:
+            return fetch(*args)
+
+        started = time.monotonic()
+        deadline = started + timeout if timeout > 0 else None
+        # Each attempt gets its own copy of the caller's context (profiling spans)
+        pending = {self.executor.submit(contextvars.copy_context().run, fetch, *args)}
+        hedge = None
+
+        if hedge_after is not None and (deadline is None or started + hedge_after < deadline):
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done and self._take_hedge():
+                hedge = self.executor.submit(contextvars.copy_context().run, fetch, *args)
+                pending.add(hedge)
+
+        error = None
+        while pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if hedge is not None:
+                        outcome = "won" if future is hedge else "lost"
+                        UPSTREAM_HEDGES.inc(provider=self.name, call=call, outcome=outcome)
+                    return future.result()
+                error = error or future.exception()
+
+        if pending:
+            # Still running; their results are dropped when they finish
+            raise UpstreamTimeout(f"{self.name}.{call} exceeded {timeout:g}s")
+        raise error
+
+    def _hedge_delay(self, call: str) -> Optional[float]:
+        """Seconds to wait before hedging, None if this call is not hedged"""
+        if self.hedge_percentile <= 0 or call not in self.HEDGED_CALLS:
+            return None
+        tracker = self.latency[call]
+        if len(tracker) < self.HEDGE_MIN_SAMPLES:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+
+    def _take_hedge(self) -> bool:
+        """Spend hedge budget if there is any left"""
+        with self._lock:
+            if self.hedges + 1 > self.calls * self.HEDGE_MAX_RATIO:
+                return False
+            self.hedges += 1
+            return True
@@ -0,0 +1,46 @@
+"""
+yfinance Provider - Live Yahoo Finance data
+"""
+
+from datetime import date
+from typing import Dict, List, Optional
+import pandas as pd
+import yfinance as yf
+
+from app.providers.base import MarketDataProvider
+
+class YFinanceProvider(MarketDataProvider):
+
+    name = "yfinance"
+
+    def info(self, ticker: str) -> Dict:
+        return yf.Ticker(ticker).info
+
+    def history(self, ticker: str, period: str) -> pd.DataFrame:
+        return yf.Ticker(ticker).history(period=period)
+
+    def bulk_history(
+        self,
+        tickers: List[str],
+        period: str,
+        start: Optional[date] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """One yf.download for the batch, split back into per-ticker frames"""
+        span = {"period": period} if start is None else {"start": start.isoformat()}
+        data = yf.download(
+            tickers, group_by="ticker",
+            auto_adjust=True, actions=True, threads=True, progress=False, **span
+        )
+
+        frames = {}
+        if data.empty:
+            return frames
+        if not isinstance(data.columns, pd.MultiIndex):
+            # Single-ticker downloads come back flat
+            frames[tickers[0]] = data.dropna(how="all")
+            return frames
+
+        for ticker in tickers:
+            if ticker in data.columns.get_level_values(0):
+                frames[ticker] = data[ticker].dropna(how="all")
+        return frames
@@ -0,0 +1,137 @@
+"""
+Broadcaster - Computes each ticker's result once per tick and fans it out
+Subscribers get a full snapshot on subscribe, then only the fields that
+changed, so server cost scales with tickers, not with viewers
+"""
+
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """One subscriber's message queue and tickers"""
+
+    QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", 16))
+
+    def __init__(self, tickers: Iterable[str]):
+        self.tickers = set(tickers)
+        # Room for at least one snapshot per ticker, so a resync always fits
+        self.queue = asyncio.Queue(maxsize=max(self.QUEUE_SIZE, len(self.tickers)))
+
+    def push(self, message: Dict, snapshot: Callable[[str], Optional[Dict]]):
+        """
+        Queue a message. A subscriber that fell behind loses its queued
+        updates (for any ticker), so it is reset to a full snapshot of every
+        ticker it follows; later diffs apply on top of those
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            for ticker in sorted(self.tickers):
+                resync = snapshot(ticker)
+                if resync is not None:
+                    self.queue.put_nowait(resync)
+
+class Broadcaster:
+
+    # Seconds between update ticks
+    INTERVAL = float(os.getenv("PUSH_INTERVAL_SECONDS", 5))
+
+    # Fields that change every tick and alone do not make an update
+    VOLATILE_FIELDS = {"timestamp"}
+
+    def __init__(self, compute: Callable[[str], Awaitable[Dict]], interval: Optional[float] = None):
+        self.compute = compute
+        self.interval = interval or self.INTERVAL
+        self.subscriptions: Set[Subscription] = set()
+        self.latest = {}  # ticker -> last computed result
+        self._task = None
+
+    async def subscribe(self, tickers: Iterable[str]) -> Subscription:
+        """Register a subscriber and queue a snapshot for each of its tickers"""
+        subscription = Subscription(tickers)
+        self.subscriptions.add(subscription)
+
+        missing = [t for t in subscription.tickers if t not in self.latest]
+        if missing:
+            await self._refresh(missing, publish=False)
+        for ticker in sorted(subscription.tickers):
+            if ticker in self.latest:
+                subscription.push(self._snapshot(ticker), self._snapshot)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    async def _loop(self):
+        # Runs only while someone is listening
+        while self.subscriptions:
+            await asyncio.sleep(self.interval)
+            tickers = set().union(*(s.tickers for s in self.subscriptions)) if self.subscriptions else set()
+            try:
+                await self._refresh(tickers, publish=True)
+            except Exception:
+                logger.exception("Broadcast tick failed")
+
+    async def _refresh(self, tickers: Iterable[str], publish: bool):
+        """Compute each ticker once, then publish changes to its subscribers"""
+        tickers = sorted(tickers)
+        results = await asyncio.gather(*(self.compute(t) for t in tickers), return_exceptions=True)
+
+        for ticker, result in zip(tickers, results):
+            if isinstance(result, BaseException):
+                logger.warning("Broadcast compute failed for %s: %s", ticker, result)
+                continue
+
+            changes = self._diff(self.latest.get(ticker), result)
+            self.latest[ticker] = result
+            if not publish or not changes:
+                continue
+
+            message = {"type": "update", "ticker": ticker, "changes": changes}
+            for subscription in list(self.subscriptions):
+                if ticker in subscription.tickers:
+                    subscription.push(message, self._snapshot)
+
+    def _snapshot(self, ticker: str) -> Optional[Dict]:
+        """Full snapshot message, None if the ticker has never computed"""
+        if ticker not in self.latest:
+            return None
+        return {"type": "snapshot", "ticker": ticker, "data": self.latest[ticker]}
+
+    def _diff(self, old: Optional[Dict], new: Dict) -> Dict:
+        """Changed fields (nested dicts diffed one level down); empty if only volatile ones moved"""
+        if old is None:
+            return dict(new)
+
+        changes = {}
+        for key, value in new.items():
+            previous = old.get(key)
+            if isinstance(value, dict) and isinstance(previous, dict):
+                nested = {k: v for k, v in value.items() if previous.get(k) != v}
+                if nested:
+                    changes[key] = nested
+            elif previous != value:
+                changes[key] = value
+
+        if set(changes) <= self.VOLATILE_FIELDS:
+            return {}
+        return changes
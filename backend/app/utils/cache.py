@@ -0,0 +1,171 @@
+"""
+Market Data Cache - Process-wide TTL + LRU cache for upstream data
+Concurrent misses for the same key share one fetch (single-flight)
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+class MarketDataCache:
+
+    # Seconds each dataset stays fresh
+    DEFAULT_TTLS = {
+        "info": 900,
+        "history": 60,
+    }
+    DEFAULT_TTL = 60
+    MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 4096))
+
+    def __init__(self, max_entries: Optional[int] = None, ttls: Optional[Dict[str, float]] = None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    @staticmethod
+    def make_key(ticker: str, dataset: str, period: Optional[str] = None) -> Tuple:
+        """Cache key for one upstream dataset"""
+        return (ticker.upper(), dataset, period)
+
+    def get(self, key: Hashable) -> Tuple[bool, object]:
+        """Return (hit, value) for a fresh entry"""
+        with self._lock:
+            return self._get_locked(key)
+
+    def set(self, key: Hashable, value) -> None:
+        """Store value under key with its dataset TTL"""
+        with self._lock:
+            self._set_locked(key, value)
+
+    def get_stale(self, key: Hashable) -> Tuple[bool, object]:
+        """
+        Return (found, value) for key even if expired, for serving while
+        upstream is down. Expired entries stay until LRU eviction
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self.stale_served += 1
+            return True, entry[1]
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable):
+        """
+        Return cached value or call loader once
+        Other threads missing on the same key wait for that call
+        """
+        hit, value, future, owner = self._claim(key)
+        if hit:
+            return value
+        if not owner:
+            return future.result()
+        return self._load(key, loader, future)
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable, executor: Executor):
+        """
+        Async get_or_load, loader runs on executor
+        Shielded so a cancelled caller never strands the shared load
+        """
+        hit, value, future, owner = self._claim(key)
+        if hit:
+            return value
+        if not owner:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()  # Keeps the caller's profiling spans
+        return await asyncio.shield(loop.run_in_executor(executor, context.run, self._load, key, loader, future))
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for health and metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "stale_served": self.stale_served,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "inflight": len(self._inflight)
+            }
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _claim(self, key: Hashable):
+        """
+        Resolve a lookup under the lock
+        Returns (hit, value, future, owner); owner means the caller must
+        load, otherwise it waits on the future of the caller that is
+        """
+        with self._lock:
+            hit, value = self._get_locked(key)
+            if hit:
+                return True, value, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return False, None, future, False
+            future = Future()
+            self._inflight[key] = future
+            return False, None, future, True
+
+    def _load(self, key: Hashable, loader: Callable, future: Future):
+        """Run loader, publish result to waiters"""
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._set_locked(key, value)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def _get_locked(self, key: Hashable) -> Tuple[bool, object]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def _set_locked(self, key: Hashable, value) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl_for(key), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _ttl_for(self, key: Hashable) -> float:
+        dataset = key[1] if isinstance(key, tuple) and len(key) > 1 else None
+        return self.ttls.get(dataset, self.DEFAULT_TTL)
+
+# Process-wide instance shared by every DataFetcher
+market_cache = MarketDataCache()
@@ -0,0 +1,146 @@
+"""
+Cycle Store - Durable SQLite (WAL) store for Pine Script cycle webhooks
+Batched inserts from the ingest pipeline, indexed range scans by
+ticker, cycle type and date
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+class CycleStore:
+
+    DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "cycles.db"
+    PATH = os.getenv("CYCLE_DB_PATH", str(DEFAULT_PATH))
+
+    COLUMNS = ["ticker", "cycle_type", "cycle_name", "date", "confidence", "days_until", "received_at"]
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cycles (
+            id INTEGER PRIMARY KEY,
+            ticker TEXT NOT NULL,
+            cycle_type TEXT NOT NULL,
+            cycle_name TEXT,
+            date TEXT NOT NULL,
+            confidence REAL,
+            days_until INTEGER,
+            received_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cycles_ticker_type_date ON cycles (ticker, cycle_type, date);
+        CREATE INDEX IF NOT EXISTS idx_cycles_date ON cycles (date);
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or self.PATH)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()  # One connection per thread, WAL lets readers run alongside the writer
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            self._conn().executescript(self.SCHEMA)
+
+    def insert_many(self, events: Iterable[Dict]) -> int:
+        """Insert webhook events in one transaction"""
+        received_at = datetime.now().isoformat()
+        rows = [
+            (
+                e['ticker'].upper(),
+                e['cycle_type'],
+                e.get('cycle_name'),
+                self._normalize_date(e['date']),
+                e.get('confidence'),
+                e.get('days_until'),
+                received_at
+            )
+            for e in events
+        ]
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO cycles ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                    rows
+                )
+        return len(rows)
+
+    def query(
+        self,
+        ticker: Optional[str] = None,
+        cycle_type: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: int = 1000
+    ) -> List[Dict]:
+        """Stored events with start <= date < end, oldest first"""
+        where, params = self._filters(ticker and [ticker], cycle_type, start, end)
+        rows = self._conn().execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM cycles {where} ORDER BY date, id LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest_by_date(self, tickers: List[str], start: date, end: date) -> List[Dict]:
+        """
+        One event per (ticker, cycle_type, date) in range, the latest received,
+        so repeated alerts for the same cycle count once
+        """
+        where, params = self._filters(tickers, None, start, end)
+        rows = self._conn().execute(
+            f"""
+            SELECT {', '.join(self.COLUMNS)} FROM cycles
+            WHERE id IN (SELECT MAX(id) FROM cycles {where} GROUP BY ticker, cycle_type, date)
+            ORDER BY date, cycle_type
+            """,
+            params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM cycles").fetchone()[0]
+
+    def ping(self) -> bool:
+        """True if the database answers"""
+        try:
+            self._conn().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _filters(self, tickers, cycle_type, start, end):
+        clauses, params = [], []
+        if tickers:
+            clauses.append(f"ticker IN ({', '.join('?' * len(tickers))})")
+            params.extend(t.upper() for t in tickers)
+        if cycle_type:
+            clauses.append("cycle_type = ?")
+            params.append(cycle_type)
+        if start:
+            clauses.append("date >= ?")
+            params.append(start.isoformat())
+        if end:
+            clauses.append("date < ?")
+            params.append(end.isoformat())
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _normalize_date(self, value: str) -> str:
+        """ISO date so string order is date order; unparseable values are kept as sent"""
+        try:
+            return datetime.fromisoformat(str(value)[:10]).date().isoformat()
+        except ValueError:
+            return str(value)
@@ -1,40 +1,396 @@
 """
 Data Fetcher - Utility for fetching market data
+All upstream access goes through here; blocking provider calls run on a
+bounded executor so async routes can overlap their I/O, and results are
+shared through the process-wide market data cache
 """
 
-import yfinance as yf
-from typing import Dict
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from app.providers import MarketDataProvider, get_provider
+from app.providers.resilient import ResilientProvider
+from app.utils.cache import MarketDataCache, market_cache
+from app.utils.history_store import HistoryStore
+from app.utils.metrics import metrics
+from app.utils.profiling import span
+from app.utils.quarantine import FailureTracker
+from app.utils.resilience import CircuitOpenError, UpstreamTimeout, UpstreamUnavailable
+
+UPSTREAM_LATENCY = metrics.histogram(
+    "moass_upstream_request_duration_seconds",
+    "Latency of upstream provider calls",
+    ["provider", "call"]
+)
+UPSTREAM_ERRORS = metrics.counter(
+    "moass_upstream_errors_total",
+    "Upstream provider calls that raised (exception) or returned nothing (empty)",
+    ["provider", "call", "reason"]
+)
+
+class TickerUnavailable(Exception):
+    """Ticker returned no data, or is backing off after recent failures"""
 
 class DataFetcher:
-    
+
+    # Max concurrent upstream calls per worker process
+    MAX_WORKERS = int(os.getenv("DATA_FETCH_WORKERS", 16))
+
+    # Tickers per bulk history download
+    BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 100))
+
+    # Stored history is topped up from upstream at most this often per ticker
+    HISTORY_SYNC_SECONDS = float(os.getenv("HISTORY_SYNC_SECONDS", 300))
+
+    # History downloaded the first time a ticker is stored
+    HISTORY_BOOTSTRAP_PERIOD = os.getenv("HISTORY_BOOTSTRAP_PERIOD", "1y")
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache: Optional[MarketDataCache] = None,
+        failures: Optional[FailureTracker] = None,
+        store: Optional[HistoryStore] = None,
+        provider: Optional[MarketDataProvider] = None
+    ):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.MAX_WORKERS,
+            thread_name_prefix="data-fetch"
+        )
+        provider = provider or get_provider()
+        # Deadlines, circuit breakers and hedging around every upstream call
+        self.provider = provider if isinstance(provider, ResilientProvider) else ResilientProvider(provider)
+        self.cache = cache or market_cache
+        self.failures = failures or FailureTracker()
+        self.store = store or HistoryStore()
+        self._synced = {}  # ticker -> monotonic time of last store sync
+        self._last_calls = {}  # provider call -> outcome of the most recent one
+
+    # ==========================================
+    # RAW DATA ACCESS
+    # ==========================================
+
+    def get_info(self, ticker: str) -> Dict:
+        """
+        Get fundamentals (yfinance .info) for ticker
+        While upstream is unavailable the last cached copy is served, however old
+        """
+        self._check_backoff(ticker)
+        key = self.cache.make_key(ticker, "info")
+        try:
+            return self.cache.get_or_load(key, lambda: self._tracked(ticker, self._fetch_info, ticker))
+        except UpstreamUnavailable as e:
+            return self._stale(key, ticker, e)
+
+    def get_history(self, ticker: str, period: str = "1d") -> pd.DataFrame:
+        """Get OHLCV history for ticker (stale copy while upstream is unavailable)"""
+        self._check_backoff(ticker)
+        key = self.cache.make_key(ticker, "history", period)
+        try:
+            return self.cache.get_or_load(key, lambda: self._tracked(ticker, self._fetch_history, ticker, period))
+        except UpstreamUnavailable as e:
+            return self._stale(key, ticker, e)
+
+    async def get_info_async(self, ticker: str) -> Dict:
+        """Non-blocking get_info"""
+        self._check_backoff(ticker)
+        key = self.cache.make_key(ticker, "info")
+        try:
+            return await self.cache.get_or_load_async(
+                key, lambda: self._tracked(ticker, self._fetch_info, ticker), self.executor
+            )
+        except UpstreamUnavailable as e:
+            return self._stale(key, ticker, e)
+
+    async def get_history_async(self, ticker: str, period: str = "1d") -> pd.DataFrame:
+        """Non-blocking get_history"""
+        self._check_backoff(ticker)
+        key = self.cache.make_key(ticker, "history", period)
+        try:
+            return await self.cache.get_or_load_async(
+                key, lambda: self._tracked(ticker, self._fetch_history, ticker, period), self.executor
+            )
+        except UpstreamUnavailable as e:
+            return self._stale(key, ticker, e)
+
+    # ==========================================
+    # BULK DATA ACCESS
+    # ==========================================
+
+    def get_bulk_history(
+        self,
+        tickers: List[str],
+        period: str = "1mo",
+        start: Optional[date] = None
+    ) -> pd.DataFrame:
+        """
+        OHLCV for many tickers as one columnar frame, columns (ticker, field)
+        Bars cover period, or everything from start when it is given.
+        Cached tickers are reused, tickers backing off are skipped, the rest
+        are downloaded BULK_BATCH_SIZE per call. A batch upstream cannot
+        serve falls back to stale cached copies
+        """
+        window = period if start is None else f"since:{start:%Y-%m-%d}"
+        frames = {}
+        missing = []
+        for ticker in tickers:
+            if self.failures.should_skip(ticker):
+                continue
+            hit, hist = self.cache.get(self.cache.make_key(ticker, "history", window))
+            if hit:
+                frames[ticker] = hist
+            else:
+                missing.append(ticker)
+
+        for batch in self._batches(missing):
+            try:
+                fetched = self._fetch_bulk_history(batch, period, start)
+            except UpstreamUnavailable:
+                for ticker in batch:
+                    found, hist = self.cache.get_stale(self.cache.make_key(ticker, "history", window))
+                    if found:
+                        frames[ticker] = hist
+                continue
+            for ticker, hist in fetched.items():
+                self.cache.set(self.cache.make_key(ticker, "history", window), hist)
+                frames[ticker] = hist
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    # ==========================================
+    # STORED HISTORY
+    # ==========================================
+
+    def sync_history(self, tickers: List[str]):
+        """
+        Fetch only bars newer than what the store holds
+        New tickers get HISTORY_BOOTSTRAP_PERIOD; stored ones are re-fetched
+        from their newest bar, which may have been a partial session
+        """
+        now = time.monotonic()
+        due = [
+            t for t in tickers
+            if now - self._synced.get(t, float('-inf')) >= self.HISTORY_SYNC_SECONDS
+        ]
+
+        requests = {}  # start date (None = bootstrap) -> tickers
+        for ticker in due:
+            last = self.store.last_date(ticker)
+            requests.setdefault(last.date() if last is not None else None, []).append(ticker)
+
+        for start, group in requests.items():
+            bulk = self.get_bulk_history(group, period=self.HISTORY_BOOTSTRAP_PERIOD, start=start)
+            if bulk.empty:
+                continue
+            for ticker in bulk.columns.get_level_values(0).unique():
+                self.store.append(ticker, bulk[ticker].dropna(how="all"))
+                self._synced[ticker] = now
+
+    def get_bulk_info(self, tickers: List[str]) -> Dict[str, Dict]:
+        """
+        Fundamentals for many tickers, fetched in parallel through the cache
+        Tickers that fail are left out of the result
+        """
+        def fetch(ticker):
+            try:
+                return self.get_info(ticker)
+            except Exception:
+                return None
+
+        infos = self.executor.map(fetch, tickers)
+        return {t: info for t, info in zip(tickers, infos) if info}
+
+    async def get_bulk_info_async(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Non-blocking get_bulk_info"""
+        infos = await asyncio.gather(
+            *(self.get_info_async(t) for t in tickers),
+            return_exceptions=True
+        )
+        return {t: info for t, info in zip(tickers, infos) if info and not isinstance(info, BaseException)}
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a blocking callable on the fetch executor, in the caller's context (profiling spans)"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, functools.partial(context.run, func, *args, **kwargs))
+
+    def close(self, wait: bool = True):
+        """Shut down the fetch and upstream pools, for fetchers that are not process-wide"""
+        self.executor.shutdown(wait=wait)
+        self.provider.close(wait=wait)
+
+    def provider_status(self) -> Dict:
+        """
+        Provider health from the most recent call of each kind and the
+        circuit breakers. available: all succeeded, degraded: some raised or
+        a circuit is open, unavailable: all raised or every circuit is open,
+        unknown: no calls yet
+        """
+        calls = dict(self._last_calls)
+        circuits = self.provider.circuit_states()
+        failed = sum(1 for outcome in calls.values() if not outcome["ok"])
+        open_circuits = sum(1 for c in circuits.values() if c["state"] != "closed")
+        if open_circuits == len(circuits) or (calls and failed == len(calls)):
+            status = "unavailable"
+        elif failed or open_circuits:
+            status = "degraded"
+        else:
+            status = "available" if calls else "unknown"
+        return {"provider": self.provider.name, "status": status, "calls": calls, "circuits": circuits}
+
+    # ==========================================
+    # PRICE / SHORT INTEREST
+    # ==========================================
+
     def get_price(self, ticker: str) -> Dict:
         """Get current price data"""
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="1d")
-            
-            if not hist.empty:
-                return {
-                    "ticker": ticker,
-                    "price": float(hist['Close'].iloc[-1]),
-                    "change": float(hist['Close'].iloc[-1] - hist['Open'].iloc[0]),
-                    "change_pct": float((hist['Close'].iloc[-1] - hist['Open'].iloc[0]) / hist['Open'].iloc[0] * 100)
-                }
+            return self._price_from_history(ticker, self.get_history(ticker, period="1d"))
+        except Exception:
             return {"ticker": ticker, "price": 0, "change": 0, "change_pct": 0}
-        except:
+
+    async def get_price_async(self, ticker: str) -> Dict:
+        """Non-blocking get_price"""
+        try:
+            return self._price_from_history(ticker, await self.get_history_async(ticker, period="1d"))
+        except Exception:
             return {"ticker": ticker, "price": 0, "change": 0, "change_pct": 0}
-    
+
     def get_short_interest(self, ticker: str) -> Dict:
         """Get short interest data"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
+            return self._short_interest_from_info(ticker, self.get_info(ticker))
+        except Exception:
+            return {"ticker": ticker, "short_percent_float": 0, "shares_short": 0, "short_ratio": 0}
+
+    async def get_short_interest_async(self, ticker: str) -> Dict:
+        """Non-blocking get_short_interest"""
+        try:
+            return self._short_interest_from_info(ticker, await self.get_info_async(ticker))
+        except Exception:
+            return {"ticker": ticker, "short_percent_float": 0, "shares_short": 0, "short_ratio": 0}
+
+    # ==========================================
+    # PRIVATE HELPERS
+    # ==========================================
+
+    def _check_backoff(self, ticker: str):
+        """Fail fast for tickers with a recent failure (negative cache hit)"""
+        if self.failures.should_skip(ticker):
+            raise TickerUnavailable(f"{ticker} is backing off after repeated failures")
+
+    def _tracked(self, ticker: str, fetch: Callable, *args):
+        """Run an upstream fetch, recording success or failure for ticker"""
+        try:
+            result = fetch(*args)
+        except UpstreamUnavailable:
+            raise  # Upstream's fault, not the ticker's
+        except Exception as e:
+            self.failures.record_failure(ticker, f"{type(e).__name__}: {e}")
+            raise TickerUnavailable(f"{ticker}: {e}") from e
+
+        if self._is_empty(result):
+            self.failures.record_failure(ticker, "no data")
+            raise TickerUnavailable(f"{ticker}: no data")
+
+        self.failures.record_success(ticker)
+        return result
+
+    def _is_empty(self, result) -> bool:
+        """No usable data, e.g. delisted ticker"""
+        if isinstance(result, pd.DataFrame):
+            return result.empty
+        return not result or all(v is None for v in result.values())
+
+    def _call_provider(self, call: str, fetch: Callable, *args):
+        """Run one provider call, recording its latency and outcome"""
+        labels = {"provider": self.provider.name, "call": call}
+        try:
+            with UPSTREAM_LATENCY.time(**labels), span(f"upstream.{call}"):
+                result = fetch(*args)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(reason=self._error_reason(e), **labels)
+            self._last_calls[call] = {"ok": False, "at": datetime.now().isoformat(), "error": f"{type(e).__name__}: {e}"}
+            raise
+
+        if self._is_empty(result):
+            UPSTREAM_ERRORS.inc(reason="empty", **labels)
+        # An empty result is a ticker problem, not an outage
+        self._last_calls[call] = {"ok": True, "at": datetime.now().isoformat()}
+        return result
+
+    def _error_reason(self, error: Exception) -> str:
+        if isinstance(error, CircuitOpenError):
+            return "circuit_open"
+        if isinstance(error, UpstreamTimeout):
+            return "timeout"
+        return "exception"
+
+    def _stale(self, key, ticker: str, error: Exception):
+        """Last cached value for key, however old; TickerUnavailable if there is none"""
+        found, value = self.cache.get_stale(key)
+        if not found:
+            raise TickerUnavailable(f"{ticker}: {error}") from error
+        return value
+
+    def _fetch_info(self, ticker: str) -> Dict:
+        """Uncached upstream .info call"""
+        return self._call_provider("info", self.provider.info, ticker)
+
+    def _fetch_history(self, ticker: str, period: str) -> pd.DataFrame:
+        """Uncached upstream .history call"""
+        return self._call_provider("history", self.provider.history, ticker, period)
+
+    def _fetch_bulk_history(
+        self,
+        tickers: List[str],
+        period: str,
+        start: Optional[date] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        One upstream download for a batch, split back into per-ticker frames
+        Tickers missing from the download count as failures
+        """
+        frames = self._call_provider("bulk_history", self.provider.bulk_history, tickers, period, start)
+
+        for ticker in tickers:
+            if ticker in frames and not frames[ticker].empty:
+                self.failures.record_success(ticker)
+            else:
+                frames.pop(ticker, None)
+                self.failures.record_failure(ticker, "no data in bulk download")
+        return frames
+
+    def _batches(self, tickers: List[str]) -> Iterator[List[str]]:
+        for i in range(0, len(tickers), self.BULK_BATCH_SIZE):
+            yield tickers[i:i + self.BULK_BATCH_SIZE]
+
+    def _price_from_history(self, ticker: str, hist: pd.DataFrame) -> Dict:
+        """Build price payload from 1d history"""
+        if not hist.empty:
             return {
                 "ticker": ticker,
-                "short_percent_float": info.get('shortPercentOfFloat', 0) * 100,
-                "shares_short": info.get('sharesShort', 0),
-                "short_ratio": info.get('shortRatio', 0)
+                "price": float(hist['Close'].iloc[-1]),
+                "change": float(hist['Close'].iloc[-1] - hist['Open'].iloc[0]),
+                "change_pct": float((hist['Close'].iloc[-1] - hist['Open'].iloc[0]) / hist['Open'].iloc[0] * 100)
             }
-        except:
-            return {"ticker": ticker, "short_percent_float": 0, "shares_short": 0, "short_ratio": 0}
+        return {"ticker": ticker, "price": 0, "change": 0, "change_pct": 0}
+
+    def _short_interest_from_info(self, ticker: str, info: Dict) -> Dict:
+        """Build short interest payload from .info"""
+        return {
+            "ticker": ticker,
+            "short_percent_float": info.get('shortPercentOfFloat', 0) * 100,
+            "shares_short": info.get('sharesShort', 0),
+            "short_ratio": info.get('shortRatio', 0)
+        }
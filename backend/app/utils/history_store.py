@@ -0,0 +1,123 @@
+"""
+History Store - Local columnar OHLCV store, one memory-mapped file per ticker
+Daily bars are appended as fixed-width records, so reading the bars
+since a date is a binary search plus a slice of the mapped file instead
+of a download
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+class HistoryStore:
+
+    DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "history"
+    PATH = os.getenv("HISTORY_STORE_PATH", str(DEFAULT_PATH))
+
+    DTYPE = np.dtype([
+        ("date", "<M8[D]"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8")
+    ])
+
+    # yfinance column -> record field
+    FIELDS = {"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}
+
+    def __init__(self, path: Optional[str] = None):
+        self.root = Path(path or self.PATH)
+        self._maps = {}  # ticker -> (file size, memmap)
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def __contains__(self, ticker: str) -> bool:
+        return self._path(ticker).exists()
+
+    def records(self, ticker: str) -> np.ndarray:
+        """All stored bars for ticker (read-only memory map), oldest first"""
+        with self._lock(ticker):
+            return self._records_locked(ticker)
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        """Date of the newest stored bar"""
+        records = self.records(ticker)
+        return pd.Timestamp(records['date'][-1]) if len(records) else None
+
+    def append(self, ticker: str, hist: pd.DataFrame) -> int:
+        """
+        Store bars from hist that are not older than the newest stored bar
+        The newest stored bar is overwritten, since it may have been a
+        partial session. Returns the number of records written
+        """
+        new = self._to_records(hist)
+        if not len(new):
+            return 0
+
+        with self._lock(ticker):
+            records = self._records_locked(ticker)
+            last = records['date'][-1] if len(records) else None
+            if last is not None:
+                new = new[new['date'] >= last]
+                if not len(new):
+                    return 0
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self._path(ticker)
+            if last is not None and new['date'][0] == last:
+                with open(path, "r+b") as f:
+                    f.seek(-self.DTYPE.itemsize, os.SEEK_END)
+                    f.write(new[:1].tobytes())
+                new_bars = new[1:]
+            else:
+                new_bars = new
+
+            with open(path, "ab") as f:
+                f.write(new_bars.tobytes())
+            return len(new)
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{ticker.upper().replace('/', '_')}.bin"
+
+    def _records_locked(self, ticker: str) -> np.ndarray:
+        """records() for a caller holding ticker's lock, so a half-written bar is never mapped"""
+        path = self._path(ticker)
+        size = path.stat().st_size if path.exists() else 0
+        if size < self.DTYPE.itemsize:
+            return np.empty(0, dtype=self.DTYPE)
+
+        cached = self._maps.get(ticker.upper())
+        if cached is None or cached[0] != size:
+            cached = (size, np.memmap(path, dtype=self.DTYPE, mode="r"))
+            self._maps[ticker.upper()] = cached
+        return cached[1]
+
+    def _lock(self, ticker: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(ticker.upper(), threading.Lock())
+
+    def _to_records(self, hist: pd.DataFrame) -> np.ndarray:
+        """Daily bars from a yfinance frame, sorted, one per date"""
+        hist = hist.dropna(subset=["Close"]) if "Close" in hist else hist.iloc[:0]
+        index = hist.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+
+        records = np.empty(len(hist), dtype=self.DTYPE)
+        records['date'] = index.normalize().values.astype("M8[D]")
+        for column, field in self.FIELDS.items():
+            records[field] = hist[column].to_numpy(dtype=float) if column in hist else np.nan
+
+        # Keep the latest bar per date
+        records = records[::-1]
+        _, keep = np.unique(records['date'], return_index=True)
+        return records[keep]
+
@@ -0,0 +1,126 @@
+"""
+Ingest Pipeline - Bounded queue with a batching background consumer
+Webhook routes only enqueue; a full queue is reported back to the caller
+(backpressure) instead of growing memory or blocking request handling
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class IngestQueueFull(Exception):
+    """Queue is at capacity, caller should retry later"""
+
+class IngestPipeline:
+
+    MAX_QUEUE = int(os.getenv("INGEST_MAX_QUEUE", 10000))
+    BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 500))
+
+    # Seconds to wait for a batch to fill once its first item arrives
+    BATCH_WAIT = float(os.getenv("INGEST_BATCH_WAIT", 0.05))
+
+    def __init__(
+        self,
+        handler: Callable[[List[Dict]], object],
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_wait: Optional[float] = None
+    ):
+        self.handler = handler  # Called with each batch; plain functions run on a worker thread
+        self.max_queue = max_queue or self.MAX_QUEUE
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.batch_wait = self.BATCH_WAIT if batch_wait is None else batch_wait
+        self._queue = None
+        self._task = None
+        self.accepted = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self):
+        """Start the consumer on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._consume())
+
+    async def stop(self):
+        """Process what is already queued, then stop the consumer"""
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def submit(self, item: Dict):
+        """
+        Queue one item for the consumer
+        Raises IngestQueueFull when at capacity. Without a running consumer
+        the item is handled right away
+        """
+        if self._task is None:
+            await self._handle([item])
+            self.accepted += 1
+            return
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise IngestQueueFull(f"Ingest queue full ({self.max_queue} items)")
+        self.accepted += 1
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "capacity": self.max_queue,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+            "batches": self.batches
+        }
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+
+            # Fill the batch from what is queued, waiting briefly for stragglers
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+            try:
+                await self._handle(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("Ingest batch of %d failed", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _handle(self, batch: List[Dict]):
+        if inspect.iscoroutinefunction(self.handler):
+            await self.handler(batch)
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, self.handler, batch)
+        self.processed += len(batch)
+        self.batches += 1
@@ -0,0 +1,257 @@
+"""
+Request Profiling - Opt-in per-request call profiles and named timing spans
+A request is profiled when it carries X-Profile-Token matching PROFILE_TOKEN,
+or is picked at PROFILE_SAMPLE_RATE. Profiled requests get Server-Timing and
+X-Profile-Id response headers; the profile is kept for /api/admin/profiles
+and, with PROFILE_DIR set, written there as a pstats file.
+
+span() is cheap when the request is not being profiled, so components can
+be wrapped permanently.
+"""
+
+import cProfile
+import contextvars
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+class Profile:
+    """Spans and (optionally) a cProfile capture for one request"""
+
+    def __init__(self, method: str, path: str, reason: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.reason = reason  # "token" or "sampled"
+        self.created_at = datetime.now()
+        self.started = time.perf_counter()
+        self.duration_ms = None
+        self.status = None
+        self.spans = []  # {"name", "start_ms", "duration_ms", "thread"}
+        self.profiler = None
+        self._context_token = None
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, started: float, ended: float):
+        if self.duration_ms is not None:
+            return  # Background work that outlived the request
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "start_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round((ended - started) * 1000, 3),
+                "thread": threading.current_thread().name
+            })
+
+    def span_totals(self) -> Dict[str, Dict]:
+        """Time per span name, summed over repeats"""
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            total = totals.setdefault(s["name"], {"count": 0, "total_ms": 0.0})
+            total["count"] += 1
+            total["total_ms"] = round(total["total_ms"] + s["duration_ms"], 3)
+        return totals
+
+    def top_functions(self, limit: int) -> List[Dict]:
+        """Heaviest functions by cumulative time from the call profile"""
+        if self.profiler is None:
+            return []
+        stats = pstats.Stats(self.profiler).stats
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": f"{func} ({Path(filename).name}:{line})",
+                "calls": calls,
+                "own_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3)
+            }
+            for (filename, line, func), (_, calls, own, cumulative, _) in rows
+        ]
+
+    def summary(self, limit: int = 30) -> Dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "call_profile": self.profiler is not None,
+            "span_totals": self.span_totals(),
+            "spans": list(self.spans),
+            "top_functions": self.top_functions(limit)
+        }
+
+_current_profile = contextvars.ContextVar("current_profile", default=None)
+_current_span = contextvars.ContextVar("current_span", default="")
+
+@contextmanager
+def span(name: str):
+    """
+    Time a block under the request being profiled, if any
+    Nested spans are named by path, e.g. scan/fetch
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    parent = _current_span.get()
+    full_name = f"{parent}/{name}" if parent else name
+    token = _current_span.set(full_name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(full_name, started, time.perf_counter())
+        _current_span.reset(token)
+
+class Profiler:
+
+    # Fraction of matching requests profiled without a token
+    SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+
+    # X-Profile-Token value that forces profiling; unset disables tokens and admin routes
+    TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+    # Only requests under these path prefixes are profiled
+    PATH_PREFIXES = tuple(p for p in os.getenv("PROFILE_PATHS", "/api/").split(",") if p)
+
+    # Profiles kept in memory, oldest dropped first
+    KEEP = int(os.getenv("PROFILE_KEEP", 50))
+
+    # Directory for .prof files (pstats format); unset keeps profiles in memory only
+    DIR = os.getenv("PROFILE_DIR", "")
+
+    HEADER = "x-profile-token"
+
+    # Reading profiles is not itself profiled
+    ADMIN_PREFIX = "/api/admin/"
+
+    def __init__(
+        self,
+        sample_rate: Optional[float] = None,
+        token: Optional[str] = None,
+        keep: Optional[int] = None,
+        directory: Optional[str] = None
+    ):
+        self.sample_rate = self.SAMPLE_RATE if sample_rate is None else sample_rate
+        self.token = self.TOKEN if token is None else token
+        self.keep = keep or self.KEEP
+        self.directory = Path(directory or self.DIR) if (directory or self.DIR) else None
+        self.profiles = OrderedDict()  # id -> Profile
+        # cProfile hooks a whole thread, so one call profile at a time
+        self._call_profile_lock = threading.Lock()
+        self._random = random.Random()
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return bool(self.token) and token == self.token
+
+    def should_profile(self, path: str, token: Optional[str]) -> Optional[str]:
+        """Why this request is profiled ("token" / "sampled"), or None"""
+        if not path.startswith(self.PATH_PREFIXES) or path.startswith(self.ADMIN_PREFIX):
+            return None
+        if token is not None and self.authorized(token):
+            return "token"
+        if self.sample_rate > 0 and self._random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def start(self, method: str, path: str, reason: str) -> Profile:
+        """Begin profiling the current request context"""
+        profile = Profile(method, path, reason)
+        profile._context_token = _current_profile.set(profile)
+        if self._call_profile_lock.acquire(blocking=False):
+            profile.profiler = cProfile.Profile()
+            profile.profiler.enable()
+        return profile
+
+    def finish(self, profile: Profile, status: Optional[int]):
+        """Stop capture, keep the profile and write it out if configured"""
+        if profile.duration_ms is None:
+            profile.duration_ms = round((time.perf_counter() - profile.started) * 1000, 3)
+            profile.status = status
+            if profile.profiler is not None:
+                profile.profiler.disable()
+                self._call_profile_lock.release()
+            _current_profile.reset(profile._context_token)
+
+            self.profiles[profile.id] = profile
+            while len(self.profiles) > self.keep:
+                self.profiles.popitem(last=False)
+
+            if self.directory is not None and profile.profiler is not None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                profile.profiler.dump_stats(str(self.directory / f"{profile.id}.prof"))
+
+    def server_timing(self, profile: Profile) -> str:
+        """Server-Timing header value from the span totals so far"""
+        parts = [
+            f'{name.replace("/", ".")};dur={total["total_ms"]}'
+            for name, total in profile.span_totals().items()
+        ]
+        parts.append(f"total;dur={round((time.perf_counter() - profile.started) * 1000, 3)}")
+        return ", ".join(parts)
+
+    def recent(self) -> List[Dict]:
+        """Kept profiles, newest first, without the call details"""
+        return [
+            {
+                "id": p.id, "method": p.method, "path": p.path, "reason": p.reason,
+                "status": p.status, "created_at": p.created_at.isoformat(), "duration_ms": p.duration_ms
+            }
+            for p in reversed(list(self.profiles.values()))
+        ]
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected HTTP requests
+    The call profile covers the event loop thread; work on executor threads
+    shows up through spans (DataFetcher.run carries the request context).
+    Other requests running on the loop at the same time appear in it too
+    """
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        token = headers.get(self.profiler.HEADER.encode())
+        reason = self.profiler.should_profile(scope["path"], token.decode() if token else None)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.start(scope["method"], scope["path"], reason)
+        status = [None]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.id.encode()),
+                    (b"server-timing", self.profiler.server_timing(profile).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.profiler.finish(profile, status[0])
@@ -0,0 +1,70 @@
+"""
+Failure Tracker - Negative caching and quarantine for failing tickers
+A failed lookup is not retried until its backoff expires; tickers that keep
+failing are quarantined and only probed once per quarantine period
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+class FailureTracker:
+
+    BACKOFF_BASE = float(os.getenv("FAILURE_BACKOFF_BASE", 30))
+    BACKOFF_MAX = float(os.getenv("FAILURE_BACKOFF_MAX", 3600))
+    QUARANTINE_AFTER = int(os.getenv("QUARANTINE_AFTER", 5))
+    QUARANTINE_SECONDS = float(os.getenv("QUARANTINE_SECONDS", 86400))
+
+    def __init__(self):
+        self._failures = {}  # upper-case ticker -> {count, retry_at, last_error}
+        self._lock = threading.Lock()
+
+    def should_skip(self, ticker: str) -> bool:
+        """True while ticker is backing off or quarantined"""
+        entry = self._failures.get(ticker.upper())
+        return entry is not None and entry['retry_at'] > time.monotonic()
+
+    def is_quarantined(self, ticker: str) -> bool:
+        entry = self._failures.get(ticker.upper())
+        return entry is not None and entry['count'] >= self.QUARANTINE_AFTER
+
+    def record_failure(self, ticker: str, error: str = "") -> None:
+        """Count a failure and push out the next retry"""
+        with self._lock:
+            entry = self._failures.setdefault(ticker.upper(), {"count": 0, "retry_at": 0.0, "last_error": ""})
+            entry['count'] += 1
+            entry['last_error'] = error
+            if entry['count'] >= self.QUARANTINE_AFTER:
+                delay = self.QUARANTINE_SECONDS
+            else:
+                delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (entry['count'] - 1))
+            entry['retry_at'] = time.monotonic() + delay
+
+    def record_success(self, ticker: str) -> None:
+        """Clear failure history after a good fetch"""
+        ticker = ticker.upper()
+        if ticker in self._failures:
+            with self._lock:
+                self._failures.pop(ticker, None)
+
+    def quarantined(self) -> List[Dict]:
+        """Quarantined tickers with their next probe time"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "ticker": ticker,
+                    "failures": entry['count'],
+                    "last_error": entry['last_error'],
+                    "retry_at": (datetime.now() + timedelta(seconds=max(0, entry['retry_at'] - now))).isoformat()
+                }
+                for ticker, entry in sorted(self._failures.items())
+                if entry['count'] >= self.QUARANTINE_AFTER
+            ]
+
+    def backing_off(self) -> int:
+        """How many tickers are currently being skipped"""
+        now = time.monotonic()
+        return sum(1 for entry in list(self._failures.values()) if entry['retry_at'] > now)
@@ -0,0 +1,117 @@
+"""
+Resilience - Circuit breaker and latency tracking for upstream calls
+Used by ResilientProvider; kept free of provider details so other
+upstream clients can reuse them
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# Errors that mean the upstream itself failed rather than one ticker's request
+# requests/curl_cffi exceptions, socket, DNS and TLS errors all derive from OSError
+TRANSPORT_ERRORS = (OSError,)
+
+class UpstreamUnavailable(Exception):
+    """Upstream did not answer: deadline passed or circuit open"""
+
+class UpstreamTimeout(UpstreamUnavailable):
+    """Call ran past its deadline"""
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Circuit is open, call not attempted"""
+
+class CircuitBreaker:
+    """
+    closed: calls go through, consecutive failures are counted
+    open: calls are refused until RESET_SECONDS have passed
+    half_open: one trial call; success closes, failure re-opens
+    """
+
+    FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+    RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", 30))
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_seconds: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or self.FAILURE_THRESHOLD
+        self.reset_seconds = self.RESET_SECONDS if reset_seconds is None else reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = ""
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    raise CircuitOpenError(f"{self.name} circuit open: {self.last_error}")
+                self.state = self.HALF_OPEN
+                self._probing = False
+            # Half-open: a single trial call at a time
+            if self._probing:
+                raise CircuitOpenError(f"{self.name} circuit half-open, trial call in flight")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self, error: str = ""):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def status(self) -> Dict:
+        with self._lock:
+            status = {"state": self.state, "failures": self.failures}
+            if self.state != self.CLOSED:
+                status["last_error"] = self.last_error
+                status["retry_in_seconds"] = round(
+                    max(0.0, self.opened_at + self.reset_seconds - time.monotonic()), 1
+                )
+            return status
+
+class LatencyTracker:
+    """Recent successful call latencies, for percentile-based hedging"""
+
+    WINDOW = int(os.getenv("HEDGE_LATENCY_WINDOW", 200))
+
+    def __init__(self, window: Optional[int] = None):
+        self._samples = deque(maxlen=window or self.WINDOW)
+        self._sorted = None  # Cached sorted copy, reset on each new sample
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self._sorted = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile (0-100) of recent latencies, None without samples"""
+        with self._lock:
+            if not self._samples:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self._samples)
+            index = min(len(self._sorted) - 1, int(len(self._sorted) * q / 100))
+            return self._sorted[index]
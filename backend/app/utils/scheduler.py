@@ -0,0 +1,143 @@
+"""
+Scan Scheduler - Keeps the market scanner snapshot fresh in the background
+Routes read the snapshot; only this loop runs full scans, and streaming
+clients follow the scan in flight instead of starting their own
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ScanScheduler:
+
+    # Seconds between background scans
+    INTERVAL = float(os.getenv("SCAN_INTERVAL_SECONDS", 900))
+
+    # batch = bulk fetch, parallel = per-ticker with deadlines
+    MODE = os.getenv("SCAN_MODE", "batch")
+
+    # Tickers that cannot reach this score are pre-filtered out of background
+    # scans, so routes refuse lower min_score values. 0 serves every threshold
+    MIN_SCORE = float(os.getenv("SCAN_MIN_SCORE", 0))
+
+    def __init__(self, scanner, interval: Optional[float] = None, mode: Optional[str] = None):
+        self.scanner = scanner
+        self.interval = interval or self.INTERVAL
+        self.mode = mode or self.MODE
+        self._task = None
+        self._wakeup = None
+        self._running = None  # Task of the scan in progress
+
+    def start(self):
+        """Start the background loop on the running event loop"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Cancel the background loop"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def trigger(self):
+        """Rescan now instead of waiting for the interval, without waiting for it"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+        else:
+            # No loop running: start (or join) a scan; failures are logged by _scan_done
+            self._start(None)
+
+    async def refresh(self, mode: Optional[str] = None):
+        """
+        Run one scan now; concurrent callers share the same scan
+        mode only applies when no scan is already running
+        """
+        return await asyncio.shield(self._start(mode))
+    
+    async def stream(
+        self,
+        limit: int = 10,
+        min_score: float = 60.0,
+        snapshot_interval: float = 1.0
+    ) -> AsyncIterator[Dict]:
+        """
+        Follow the scan in flight, starting a parallel one if none is running
+        result: each ticker at/above min_score as the scan scores it
+        snapshot: current top `limit` results, every snapshot_interval seconds
+        done: final scan stats (error if the scan failed)
+        """
+        queue = self.scanner.listen()
+        scan = self._start("parallel")
+        next_snapshot = time.monotonic() + snapshot_interval
+        getter = None
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                timeout = max(0.0, next_snapshot - time.monotonic())
+                await asyncio.wait({getter, scan}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if getter.done():
+                    event = getter.result()
+                    if event["event"] == "done":
+                        yield {"event": "snapshot", "data": self.scanner.top_candidates(limit, min_score)}
+                        yield event
+                        return
+                    if event["data"]["score"] >= min_score:
+                        yield event
+                else:
+                    getter.cancel()
+                    if scan.done() and queue.empty():
+                        # Scan ended without publishing: it failed
+                        error = scan.exception()
+                        yield {"event": "error", "data": {"detail": str(error) if error else "scan ended"}}
+                        return
+                
+                if time.monotonic() >= next_snapshot:
+                    yield {"event": "snapshot", "data": self.scanner.top_candidates(limit, min_score)}
+                    next_snapshot = time.monotonic() + snapshot_interval
+        finally:
+            self.scanner.unlisten(queue)
+            if getter is not None:
+                getter.cancel()
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _start(self, mode: Optional[str]) -> asyncio.Future:
+        """The scan in flight, started in mode if none is running"""
+        if self._running is None or self._running.done():
+            self._running = asyncio.ensure_future(self._scan(mode or self.mode))
+            self._running.add_done_callback(self._scan_done)
+        return self._running
+
+    def _scan_done(self, task: asyncio.Future):
+        # Also retrieves the exception of scans nobody awaited
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Background scan failed", exc_info=task.exception())
+
+    async def _loop(self):
+        while True:
+            # Cleared before scanning, so a trigger() during the scan runs another one
+            self._wakeup.clear()
+            try:
+                await self.refresh()
+            except Exception:
+                pass  # Logged by _scan_done
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _scan(self, mode: str):
+        # Every scored ticker lands in the index, limit only shapes the return value
+        if mode == "parallel":
+            return await self.scanner.scan_market_parallel(limit=1, min_score=self.MIN_SCORE)
+        return await self.scanner.scan_market_async(limit=1, min_score=self.MIN_SCORE)
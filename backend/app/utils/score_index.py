@@ -0,0 +1,78 @@
+"""
+Score Index - Incrementally maintained ranking of scanner results
+One ticker's score can change without re-sorting the rest, and any
+limit/min_score query is answered from the same ordering in O(limit)
+"""
+
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class ScoreIndex:
+
+    def __init__(self):
+        self._order = []  # sorted (-score, ticker) keys, best first
+        self._entries = {}  # ticker -> result dict
+        self._keys = {}  # ticker -> its key in _order
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._entries
+
+    def update(self, result: Dict) -> None:
+        """Insert or re-rank one ticker's result"""
+        with self._lock:
+            self._update_locked(result)
+
+    def update_many(self, results: Iterable[Dict]) -> None:
+        """Insert or re-rank several results under one lock"""
+        with self._lock:
+            for result in results:
+                self._update_locked(result)
+
+    def remove(self, ticker: str) -> None:
+        """Drop a ticker from the ranking"""
+        with self._lock:
+            key = self._keys.pop(ticker, None)
+            if key is not None:
+                del self._order[bisect.bisect_left(self._order, key)]
+                del self._entries[ticker]
+
+    def get(self, ticker: str) -> Optional[Dict]:
+        """Current result for ticker"""
+        return self._entries.get(ticker)
+
+    def top(self, limit: int, min_score: float = 0.0) -> List[Dict]:
+        """Best `limit` results scoring at least min_score"""
+        with self._lock:
+            top = []
+            for neg_score, ticker in self._order:
+                if len(top) >= limit or -neg_score < min_score:
+                    break
+                top.append(self._entries[ticker])
+            return top
+
+    def ranked(self) -> Tuple[Dict, ...]:
+        """Every result, best first"""
+        with self._lock:
+            return tuple(self._entries[ticker] for _, ticker in self._order)
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _update_locked(self, result: Dict) -> None:
+        ticker = result['ticker']
+        key = (-result['score'], ticker)
+        old_key = self._keys.get(ticker)
+
+        if old_key != key:
+            if old_key is not None:
+                del self._order[bisect.bisect_left(self._order, old_key)]
+            bisect.insort(self._order, key)
+            self._keys[ticker] = key
+
+        self._entries[ticker] = result
@@ -0,0 +1,125 @@
+"""
+Scan Universe - File-backed list of scannable tickers with static attributes
+Lets the scanner drop tickers that cannot reach min_score before fetching them
+
+Refresh the static columns with:
+    python -m app.utils.universe build [path]
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+class ScanUniverse:
+
+    DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "universe.csv"
+    PATH = os.getenv("SCAN_UNIVERSE_PATH", str(DEFAULT_PATH))
+
+    # Pre-filter settings
+    EXCHANGES = set(os.getenv("SCAN_EXCHANGES", "NYSE,NASDAQ,AMEX").split(","))
+    MIN_AVG_VOLUME = float(os.getenv("SCAN_MIN_AVG_VOLUME", 0))
+    # Assumed max growth of stored short interest before the next fetch
+    # (e.g. 1.5); unset keeps the pre-filter a strict upper bound
+    SI_HEADROOM = float(os.getenv("SCAN_SI_HEADROOM", 0))
+
+    COLUMNS = ["ticker", "exchange", "float_shares", "avg_volume", "short_interest", "active"]
+
+    # yfinance exchange codes -> listing exchange
+    EXCHANGE_CODES = {
+        "NYQ": "NYSE", "NYS": "NYSE",
+        "NMS": "NASDAQ", "NGM": "NASDAQ", "NCM": "NASDAQ", "NAS": "NASDAQ",
+        "ASE": "AMEX", "PCX": "AMEX",
+        "PNK": "OTC", "OQB": "OTC", "OQX": "OTC"
+    }
+
+    def __init__(self, frame: pd.DataFrame):
+        frame = frame.reindex(columns=self.COLUMNS)
+        frame["ticker"] = frame["ticker"].str.upper()
+        frame["active"] = frame["active"].fillna(1).astype(bool)
+        self.frame = frame.set_index("ticker")
+
+    def __len__(self) -> int:
+        return int(self.frame["active"].sum())
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "ScanUniverse":
+        """Load a universe from CSV or Parquet"""
+        path = Path(path or cls.PATH)
+        if path.suffix == ".parquet":
+            return cls(pd.read_parquet(path))
+        return cls(pd.read_csv(path))
+
+    def save(self, path: Optional[str] = None):
+        """Write the universe back to CSV or Parquet"""
+        path = Path(path or self.PATH)
+        frame = self.frame.reset_index()
+        frame["active"] = frame["active"].astype(int)
+        if path.suffix == ".parquet":
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+
+    @property
+    def tickers(self) -> List[str]:
+        """All active tickers"""
+        return self.frame.index[self.frame["active"]].tolist()
+
+    def prefilter(self, min_score: float, engine) -> List[str]:
+        """
+        Active tickers on allowed exchanges whose best possible scan score,
+        given static attributes, still reaches min_score (see
+        ScoringEngine.max_scan_score for what SI_HEADROOM changes)
+        """
+        frame = self.frame
+        keep = frame["active"].to_numpy(copy=True)
+
+        exchange = frame["exchange"]
+        keep &= (exchange.isna() | exchange.isin(self.EXCHANGES)).to_numpy()
+
+        if self.MIN_AVG_VOLUME > 0:
+            avg_volume = frame["avg_volume"]
+            keep &= (avg_volume.isna() | (avg_volume >= self.MIN_AVG_VOLUME)).to_numpy()
+
+        if min_score > 0:
+            # Scores are rounded to 0.1, allow for that
+            keep &= engine.max_scan_score(frame, self.SI_HEADROOM) >= min_score - 0.05
+
+        return frame.index[keep].tolist()
+
+    def refresh_from(self, data_fetcher) -> "ScanUniverse":
+        """Re-populate static columns from current fundamentals"""
+        tickers = self.frame.index.tolist()
+        infos = data_fetcher.get_bulk_info(tickers)
+
+        rows = []
+        for ticker in tickers:
+            old = self.frame.loc[ticker]
+            info = infos.get(ticker)
+            if not info:
+                # Keep what we had, a failed fetch is not proof of delisting
+                rows.append({"ticker": ticker, **old.to_dict()})
+                continue
+            short_pct = info.get('shortPercentOfFloat')
+            rows.append({
+                "ticker": ticker,
+                "exchange": self.EXCHANGE_CODES.get(info.get('exchange'), info.get('exchange') or old["exchange"]),
+                "float_shares": info.get('floatShares', np.nan),
+                "avg_volume": info.get('averageVolume', np.nan),
+                "short_interest": short_pct * 100 if short_pct else np.nan,
+                "active": old["active"]
+            })
+        return ScanUniverse(pd.DataFrame(rows))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        sys.exit("usage: python -m app.utils.universe build [path]")
+
+    from app.utils.data_fetcher import DataFetcher
+
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+    universe = ScanUniverse.load(target).refresh_from(DataFetcher())
+    universe.save(target)
+    print(f"Wrote {len(universe)} active tickers")
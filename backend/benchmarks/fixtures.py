@@ -0,0 +1,104 @@
+"""
+Benchmark Fixtures - Deterministic synthetic market data in replay format
+Generated once per seed and universe size, then served by ReplayProvider,
+so benchmark runs never touch the network and see the same data every time
+"""
+
+import zlib
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from app.providers.base import MarketDataProvider
+from app.providers.replay import ReplayProvider
+from app.utils.universe import ScanUniverse
+
+class SyntheticProvider(MarketDataProvider):
+    """Seeded random fundamentals and a geometric random walk of daily bars"""
+
+    name = "synthetic"
+
+    # Bars generated per ticker (about one trading year)
+    SESSIONS = 260
+    LAST_SESSION = date(2024, 12, 31)
+
+    EXCHANGES = ["NYQ", "NMS", "NGM", "ASE"]
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+
+    def info(self, ticker: str) -> Dict:
+        rng = self._rng(ticker, "info")
+        float_shares = float(rng.uniform(5e6, 5e8))
+        short_pct = float(rng.beta(1.5, 8))
+        avg_volume = float(float_shares * rng.uniform(0.002, 0.05))
+        price = float(rng.uniform(1, 200))
+        return {
+            "symbol": ticker,
+            "exchange": self.EXCHANGES[int(rng.integers(len(self.EXCHANGES)))],
+            "floatShares": float_shares,
+            "sharesShort": float_shares * short_pct,
+            "shortPercentOfFloat": short_pct,
+            "shortRatio": float_shares * short_pct / avg_volume,
+            "averageVolume": avg_volume,
+            "currentPrice": price,
+            "regularMarketPrice": price
+        }
+
+    def history(self, ticker: str, period: str) -> pd.DataFrame:
+        rng = self._rng(ticker, "history")
+        info = self.info(ticker)
+
+        returns = rng.normal(0.0005, 0.035, self.SESSIONS)
+        close = info["currentPrice"] * np.exp(np.cumsum(returns) - returns.sum())
+        spread = np.abs(rng.normal(0, 0.02, self.SESSIONS))
+        volume = info["averageVolume"] * rng.lognormal(0, 0.5, self.SESSIONS)
+
+        return pd.DataFrame(
+            {
+                "Open": close * (1 + rng.normal(0, 0.01, self.SESSIONS)),
+                "High": close * (1 + spread),
+                "Low": close * (1 - spread),
+                "Close": close,
+                "Volume": volume.round()
+            },
+            index=pd.bdate_range(end=self.LAST_SESSION, periods=self.SESSIONS, name="Date")
+        )
+
+    def bulk_history(self, tickers: List[str], period: str, start: Optional[date] = None) -> Dict[str, pd.DataFrame]:
+        return {ticker: self.history(ticker, period) for ticker in tickers}
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _rng(self, ticker: str, stream: str) -> np.random.Generator:
+        # Stable per ticker across runs (unlike hash(), which is salted per process)
+        return np.random.default_rng([self.seed, zlib.crc32(f"{ticker}:{stream}".encode())])
+
+def universe_tickers(size: int) -> List[str]:
+    """GME and AMC followed by synthetic symbols, size in total"""
+    specialists = ["GME", "AMC"][:size]
+    return specialists + [f"SYN{i:05d}" for i in range(size - len(specialists))]
+
+def build_fixtures(root: Path, size: int, seed: int = 0) -> Path:
+    """
+    Write replay fixtures and a scan universe for size tickers under root
+    Returns the universe path. Tickers already recorded are reused, so
+    smaller universes share the fixtures of larger ones
+    """
+    root = Path(root)
+    replay_path = root / "replay"
+    tickers = universe_tickers(size)
+
+    missing = [t for t in tickers if not (replay_path / t / "history.csv").exists()]
+    if missing:
+        ReplayProvider.record(SyntheticProvider(seed), missing, path=str(replay_path))
+
+    universe_path = root / f"universe_{size}.csv"
+    if not universe_path.exists():
+        # Static columns left blank so the pre-filter keeps every ticker
+        ScanUniverse(pd.DataFrame({"ticker": tickers, "exchange": "NYSE"})).save(str(universe_path))
+    return universe_path
@@ -0,0 +1,357 @@
+"""
+Benchmark Runner - Offline throughput, latency and memory for the hot paths
+Covers the calculators, full-universe scans and the API routes through an
+in-process client, all served by ReplayProvider from synthetic fixtures.
+Results are written as JSON; pass --baseline to compare against an earlier run.
+
+    cd backend
+    python -m benchmarks.run [--sizes 15,500,5000] [--iterations 50]
+                             [--groups calculators,scanner,api] [--latency 0]
+                             [--output results.json] [--baseline old.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+FIXTURE_DIR = Path(os.getenv("BENCHMARK_FIXTURE_DIR", str(BENCHMARK_DIR / ".fixtures")))
+RESULTS_DIR = BENCHMARK_DIR / "results"
+
+GROUPS = ["calculators", "scanner", "api"]
+
+class BenchmarkSuite:
+
+    # p50 slowdown (fraction) reported as a regression against a baseline
+    REGRESSION_THRESHOLD = 0.2
+
+    def __init__(self, iterations: int, scan_iterations: int, threshold: Optional[float] = None):
+        self.iterations = iterations
+        self.scan_iterations = scan_iterations
+        self.threshold = self.REGRESSION_THRESHOLD if threshold is None else threshold
+        self.results = []
+
+    def measure(
+        self,
+        group: str,
+        name: str,
+        fn: Callable[[int], object],
+        size: Optional[int] = None,
+        iterations: Optional[int] = None,
+        setup: Optional[Callable[[int], object]] = None
+    ) -> Dict:
+        """
+        Time fn(i) for each iteration i, then run it once more under
+        tracemalloc for peak memory (tracing slows calls, so it is kept out
+        of the timings). setup(i), if given, runs untimed before each call
+        and its result is passed to fn instead of i
+        """
+        iterations = iterations or self.iterations
+        timings = []
+        for i in range(iterations):
+            arg = setup(i) if setup else i
+            started = time.perf_counter()
+            fn(arg)
+            timings.append(time.perf_counter() - started)
+
+        arg = setup(iterations) if setup else iterations
+        tracemalloc.start()
+        try:
+            fn(arg)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timings = np.array(timings) * 1000
+        total_seconds = timings.sum() / 1000
+        result = {
+            "group": group,
+            "name": name,
+            "size": size,
+            "iterations": iterations,
+            "ops_per_sec": round(iterations / total_seconds, 2) if total_seconds > 0 else None,
+            "p50_ms": round(float(np.percentile(timings, 50)), 3),
+            "p99_ms": round(float(np.percentile(timings, 99)), 3),
+            "mean_ms": round(float(timings.mean()), 3),
+            "max_ms": round(float(timings.max()), 3),
+            "peak_memory_mb": round(peak / 2**20, 3)
+        }
+        if size:
+            result["tickers_per_sec"] = round(size * iterations / total_seconds, 1) if total_seconds > 0 else None
+
+        self.results.append(result)
+        self._print_result(result)
+        return result
+
+    def compare(self, baseline: List[Dict]) -> List[Dict]:
+        """Per-benchmark change against a baseline run; regressions are flagged"""
+        previous = {self._key(r): r for r in baseline}
+        rows = []
+        for result in self.results:
+            old = previous.get(self._key(result))
+            if old is None or not old.get("p50_ms"):
+                continue
+            change = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"]
+            rows.append({
+                "benchmark": self._key(result),
+                "p50_ms": result["p50_ms"],
+                "baseline_p50_ms": old["p50_ms"],
+                "p50_change": round(change, 4),
+                "regression": change > self.threshold
+            })
+        return rows
+
+    # ==========================================
+    # PRIVATE METHODS
+    # ==========================================
+
+    def _key(self, result: Dict) -> str:
+        return f"{result['name']}[{result['size']}]" if result.get("size") else result["name"]
+
+    def _print_result(self, r: Dict):
+        print(
+            f"  {self._key(r):<48} {r['ops_per_sec'] or 0:>10.2f} op/s"
+            f"  p50 {r['p50_ms']:>9.2f} ms  p99 {r['p99_ms']:>9.2f} ms"
+            f"  peak {r['peak_memory_mb']:>8.2f} MB"
+        )
+
+# ==========================================
+# BENCHMARK GROUPS
+# ==========================================
+
+def bench_calculators(suite: BenchmarkSuite, tickers: List[str], workdir: Path):
+    from app.calculators.gme_specialist import GMESpecialistCalculator
+    from app.calculators.universal_calculator import UniversalCalculator
+    from app.utils.cache import MarketDataCache
+    from app.utils.cycle_store import CycleStore
+    from app.utils.data_fetcher import DataFetcher
+    from app.utils.history_store import HistoryStore
+
+    print("calculators")
+    fetcher = DataFetcher(cache=MarketDataCache(), store=HistoryStore(str(workdir / "calc_history")))
+    gme = GMESpecialistCalculator(fetcher, CycleStore(str(workdir / "calc_cycles.db")))
+    universal = UniversalCalculator(fetcher)
+
+    try:
+        # Failed fetches fall back to default metrics quickly, which would make
+        # every number below meaningless
+        if not universal.get_metrics("AMC")["current_price"]:
+            raise RuntimeError(f"Replay fixtures not served from {fetcher.provider.provider.root}")
+
+        gme.calculate_probability("GME")
+        suite.measure("calculators", "gme.calculate_probability", lambda i: gme.calculate_probability("GME"))
+        suite.measure(
+            "calculators", "gme.get_convergences",
+            lambda i: gme.get_convergences(["GME", "AMC"], 1095, 3, 2, 20)
+        )
+        # Every fixture session for both tickers (prices cached after the first call)
+        backtest_start = date.today() - timedelta(days=3 * 365)
+        suite.measure(
+            "calculators", "gme.backtest_frames",
+            lambda i: gme.backtest_frames(["GME", "AMC"], backtest_start)
+        )
+
+        # Cold: every call is a ticker nothing has fetched yet
+        cold = iter(tickers[2:])
+        suite.measure("calculators", "universal.get_metrics.cold", lambda t: universal.get_metrics(t), setup=lambda i: next(cold))
+        suite.measure(
+            "calculators", "universal.calculate_probability.cold",
+            lambda t: universal.calculate_probability(t), setup=lambda i: next(cold)
+        )
+
+        universal.calculate_probability("AMC")
+        suite.measure("calculators", "universal.get_metrics.warm", lambda i: universal.get_metrics("AMC"))
+        suite.measure("calculators", "universal.calculate_probability.warm", lambda i: universal.calculate_probability("AMC"))
+    finally:
+        fetcher.close()
+
+def bench_scanner(suite: BenchmarkSuite, sizes: List[int], fixture_root: Path, seed: int, workdir: Path):
+    from app.calculators.market_scanner import MarketScanner
+    from app.utils.cache import MarketDataCache
+    from app.utils.data_fetcher import DataFetcher
+    from app.utils.history_store import HistoryStore
+    from app.utils.universe import ScanUniverse
+    from benchmarks.fixtures import build_fixtures
+
+    print("scanner")
+    for size in sizes:
+        universe = ScanUniverse.load(str(build_fixtures(fixture_root, size, seed)))
+
+        fetchers = []
+
+        def fresh_scanner(i, size=size, universe=universe, fetchers=fetchers):
+            # Empty cache and history store: the scan pays for every fetch
+            store = HistoryStore(str(workdir / f"scan_history_{size}_{i}"))
+            fetchers.append(DataFetcher(cache=MarketDataCache(), store=store))
+            return MarketScanner(fetchers[-1], universe)
+
+        try:
+            suite.measure(
+                "scanner", "scanner.scan_market.cold",
+                lambda scanner: scanner.scan_market(limit=10, min_score=0),
+                size=size, iterations=suite.scan_iterations, setup=fresh_scanner
+            )
+
+            warm = fresh_scanner("warm")
+            warm.scan_market(limit=10, min_score=0)
+            suite.measure(
+                "scanner", "scanner.scan_market.warm",
+                lambda i: warm.scan_market(limit=10, min_score=0),
+                size=size, iterations=suite.scan_iterations
+            )
+        finally:
+            for fetcher in fetchers:
+                fetcher.close()
+
+def bench_api(suite: BenchmarkSuite, tickers: List[str]):
+    from fastapi.testclient import TestClient
+    from app import main
+
+    print("api")
+    backtest_start = (date.today() - timedelta(days=3 * 365)).isoformat()
+    batch = {"tickers": tickers[:50]}
+    webhook = {
+        "ticker": "GME", "cycle_type": "ftd35", "cycle_name": "FTD T+35",
+        "date": datetime.now().date().isoformat(), "confidence": 0.8, "days_until": 3
+    }
+    routes = [
+        ("GET /health", lambda c: c.get("/health")),
+        ("GET /api/gme/probability", lambda c: c.get("/api/gme/probability")),
+        ("GET /api/specialist/convergences", lambda c: c.get("/api/specialist/convergences", params={"days_ahead": 1095})),
+        ("GET /api/specialist/backtest", lambda c: c.get("/api/specialist/backtest", params={"start": backtest_start})),
+        ("GET /api/universal/{ticker}/metrics", lambda c: c.get(f"/api/universal/{tickers[2]}/metrics")),
+        ("GET /api/universal/{ticker}/probability", lambda c: c.get(f"/api/universal/{tickers[2]}/probability")),
+        ("POST /api/universal/probability/batch", lambda c: c.post("/api/universal/probability/batch", json=batch)),
+        ("GET /api/compare", lambda c: c.get("/api/compare", params={"ticker1": "GME", "ticker2": "AMC"})),
+        ("GET /api/compare/matrix", lambda c: c.get("/api/compare/matrix", params={"tickers": ",".join(tickers[:20])})),
+        ("GET /api/scanner/top", lambda c: c.get("/api/scanner/top", params={"min_score": 0})),
+        ("POST /api/webhook/cycle", lambda c: c.post("/api/webhook/cycle", json=webhook)),
+    ]
+
+    with TestClient(main.app) as client:
+        for name, call in routes:
+            # Prime caches and the scan snapshot; timings are the warm path
+            response = call(client)
+            if response.status_code >= 400:
+                print(f"  {name}: HTTP {response.status_code}, skipped")
+                continue
+            suite.measure("api", name, lambda i, call=call: call(client), size=len(main.scanner.universe) if "scanner" in name else None)
+    main.data_fetcher.close()
+
+# ==========================================
+# ENTRY POINT
+# ==========================================
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the MOASS Terminal backend")
+    parser.add_argument("--sizes", default="15,500,5000", help="Scan universe sizes, comma-separated")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per calculator/API benchmark")
+    parser.add_argument("--scan-iterations", type=int, default=3, help="Timed scans per universe size")
+    parser.add_argument("--groups", default=",".join(GROUPS), help="Benchmark groups to run")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated upstream latency per call, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency per call, seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Fixture and jitter seed")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, help="p50 slowdown counted as a regression (default 0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any p50 regressed past the threshold")
+    return parser.parse_args(argv)
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BENCHMARK_DIR, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    groups = [g for g in args.groups.split(",") if g]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        sys.exit(f"Unknown benchmark groups: {', '.join(sorted(unknown))}")
+
+    workdir_handle = tempfile.TemporaryDirectory(prefix="moass-bench-")
+    workdir = Path(workdir_handle.name)
+    api_size = 500 if 500 in sizes else max(sizes)
+
+    fixture_root = FIXTURE_DIR / f"seed{args.seed}"
+
+    # Settings are read when app modules are imported, so set them before
+    # importing anything from app (benchmarks.fixtures included)
+    os.environ.update({
+        "DATA_PROVIDER": "replay",
+        "REPLAY_PATH": str(fixture_root / "replay"),
+        "REPLAY_LATENCY": str(args.latency),
+        "REPLAY_JITTER": str(args.jitter),
+        "REPLAY_SEED": str(args.seed),
+        "HISTORY_STORE_PATH": str(workdir / "history"),
+        "CYCLE_DB_PATH": str(workdir / "cycles.db"),
+        "SCAN_UNIVERSE_PATH": str(fixture_root / f"universe_{api_size}.csv"),
+        "SCAN_SCHEDULER": "off"
+    })
+
+    from benchmarks.fixtures import build_fixtures, universe_tickers
+
+    # Enough distinct tickers for every cold calculator call
+    fixture_size = max(sizes + [2 * args.iterations + 4])
+    print(f"Preparing fixtures for {fixture_size} tickers in {fixture_root}")
+    build_fixtures(fixture_root, fixture_size, args.seed)
+    build_fixtures(fixture_root, api_size, args.seed)
+    tickers = universe_tickers(fixture_size)
+
+    suite = BenchmarkSuite(args.iterations, args.scan_iterations, args.threshold)
+    try:
+        if "calculators" in groups:
+            bench_calculators(suite, tickers, workdir)
+        if "scanner" in groups:
+            bench_scanner(suite, sizes, fixture_root, args.seed, workdir)
+        if "api" in groups:
+            bench_api(suite, tickers)
+    finally:
+        workdir_handle.cleanup()
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {
+            "sizes": sizes, "iterations": args.iterations, "scan_iterations": args.scan_iterations,
+            "groups": groups, "latency": args.latency, "jitter": args.jitter, "seed": args.seed
+        },
+        "results": suite.results
+    }
+
+    exit_code = 0
+    if args.baseline:
+        comparison = suite.compare(json.loads(Path(args.baseline).read_text())["results"])
+        report["baseline"] = {"path": args.baseline, "comparison": comparison}
+        print("\ncompared to baseline (p50)")
+        for row in comparison:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"  {row['benchmark']:<48} {row['baseline_p50_ms']:>9.2f} -> {row['p50_ms']:>9.2f} ms  {row['p50_change']:+.1%}{flag}")
+        if args.fail_on_regression and any(row["regression"] for row in comparison):
+            exit_code = 1
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {output}")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
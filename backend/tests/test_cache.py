@@ -0,0 +1,88 @@
+"""
+MarketDataCache TTL, LRU eviction and single-flight loading
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.cache import MarketDataCache
+
+def test_entries_expire_after_dataset_ttl():
+    cache = MarketDataCache(ttls={"info": 0.05})
+    key = cache.make_key("gme", "info")
+    cache.set(key, {"price": 1})
+    assert cache.get(key) == (True, {"price": 1})
+    time.sleep(0.06)
+    assert cache.get(key) == (False, None)
+    assert cache.get_stale(key) == (True, {"price": 1})
+
+def test_least_recently_used_entry_is_evicted():
+    cache = MarketDataCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+
+def test_concurrent_misses_share_one_load():
+    cache = MarketDataCache()
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(1)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_load, "key", loader) for _ in range(8)]
+        time.sleep(0.05)
+        release.set()
+        assert [f.result() for f in futures] == ["value"] * 8
+
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 7
+    assert cache.stats()["inflight"] == 0
+
+def test_failed_load_reaches_waiters_and_is_not_cached():
+    cache = MarketDataCache()
+    release = threading.Event()
+
+    def loader():
+        release.wait(1)
+        raise ValueError("upstream said no")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(cache.get_or_load, "key", loader) for _ in range(2)]
+        time.sleep(0.05)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+    assert cache.get_or_load("key", lambda: "retried") == "retried"
+
+def test_async_load_survives_cancelled_owner():
+    cache = MarketDataCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    async def main(executor):
+        owner = asyncio.ensure_future(cache.get_or_load_async("key", loader, executor))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.get_or_load_async("key", loader, executor))
+        owner.cancel()
+        return await waiter
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert asyncio.run(main(executor)) == "value"
+    assert len(calls) == 1
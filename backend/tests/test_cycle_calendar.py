@@ -0,0 +1,25 @@
+"""
+Upcoming cycle windows of the GME specialist calendar
+"""
+
+from datetime import datetime, timedelta
+
+from app.calculators.gme_specialist import GMESpecialistCalculator
+
+def make_calculator():
+    # Only the calendar is exercised, so no data fetcher is needed
+    return GMESpecialistCalculator(data_fetcher=object())
+
+def test_window_last_day_is_inclusive():
+    calc = make_calculator()
+    # OPEX on 2027-03-19 is exactly 360 days out
+    events = calc._upcoming_cycles(datetime(2026, 3, 24, 10, 30))
+    assert ("opex", datetime(2027, 3, 19)) in [(e["type"], e["date"]) for e in events]
+
+def test_events_stay_within_their_windows():
+    calc = make_calculator()
+    start = datetime(2025, 1, 1, 9, 0)
+    for offset in range(0, 400, 7):
+        for event in calc._upcoming_cycles(start + timedelta(days=offset)):
+            first, last = calc.UPCOMING_WINDOWS[event["type"]]
+            assert first <= event["days_until"] <= last
@@ -0,0 +1,46 @@
+"""
+HistoryStore appends and partial-bar overwrite
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.history_store import HistoryStore
+
+def bars(days, closes, end=None):
+    end = end or pd.Timestamp.today().normalize()
+    index = pd.date_range(end=end, periods=days, freq="D", name="Date")
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": closes}, index=index)
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path))
+
+def test_append_writes_sorted_records(store):
+    assert store.append("GME", bars(3, [1, 2, 3])) == 3
+    assert store.records("GME")['close'].tolist() == [1, 2, 3]
+    assert store.last_date("gme") == pd.Timestamp.today().normalize()
+
+def test_newest_bar_is_overwritten_and_older_bars_skipped(store):
+    store.append("GME", bars(3, [1, 2, 3]))
+    # Same three days again with a revised partial session for the last one
+    assert store.append("GME", bars(3, [9, 9, 4])) == 1
+    assert store.records("GME")['close'].tolist() == [1, 2, 4]
+
+def test_append_extends_past_newest_bar(store):
+    today = pd.Timestamp.today().normalize()
+    store.append("GME", bars(2, [1, 2], end=today - pd.Timedelta(days=2)))
+    assert store.append("GME", bars(3, [2.5, 3, 4])) == 3
+    assert store.records("GME")['close'].tolist() == [1, 2.5, 3, 4]
+
+def test_duplicate_dates_keep_latest_row(store):
+    hist = bars(2, [1, 2])
+    hist = pd.concat([hist, hist.iloc[[-1]] * 5])
+    store.append("GME", hist)
+    assert store.records("GME")['close'].tolist() == [1, 10]
+
+def test_missing_ticker_is_empty(store):
+    assert len(store.records("NOPE")) == 0
+    assert store.last_date("NOPE") is None
@@ -0,0 +1,51 @@
+"""
+Prometheus text rendering: every sample belongs to the family its TYPE line names
+"""
+
+import pytest
+
+from app.utils.metrics import MetricsRegistry, metrics
+
+SUFFIXES = {"histogram": ("_bucket", "_sum", "_count")}
+
+def families(text):
+    """{family: (kind, [sample names])} from rendered text"""
+    found = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            current = found[name] = (kind, [])
+        elif line and not line.startswith("#"):
+            current[1].append(line.split("{")[0].split(" ")[0])
+    return found
+
+def assert_samples_match_types(text):
+    for family, (kind, samples) in families(text).items():
+        allowed = {family + suffix for suffix in SUFFIXES.get(kind, ("",))}
+        assert set(samples) <= allowed, f"{family} ({kind}) has samples {set(samples) - allowed}"
+
+def test_sample_names_match_type_lines():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs", ["outcome"]).inc(outcome="ok")
+    registry.gauge("queue_depth", "Depth").set(3)
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1)).observe(0.5)
+    registry.collector(lambda: [("hits_total", "counter", "Hits", {}, 2)])
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{outcome="ok"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert_samples_match_types(text)
+
+def test_counter_names_must_end_in_total():
+    with pytest.raises(ValueError):
+        MetricsRegistry().counter("jobs", "Jobs")
+
+def test_app_metrics_are_typed_by_sample_name():
+    from app import main  # noqa: F401  registers every app metric
+
+    for metric in list(metrics._metrics.values()):
+        if metric.kind == "counter":
+            metric.inc(**{label: "test" for label in metric.labelnames})
+    assert_samples_match_types(metrics.render())
@@ -0,0 +1,25 @@
+"""
+FailureTracker backoff, quarantine and ticker case handling
+"""
+
+from app.utils.quarantine import FailureTracker
+
+def test_failures_back_off_then_quarantine():
+    tracker = FailureTracker()
+    tracker.record_failure("GME", "timeout")
+    assert tracker.should_skip("GME")
+    assert not tracker.is_quarantined("GME")
+    for _ in range(tracker.QUARANTINE_AFTER - 1):
+        tracker.record_failure("GME", "timeout")
+    assert tracker.is_quarantined("GME")
+    assert [q["ticker"] for q in tracker.quarantined()] == ["GME"]
+
+def test_lookups_ignore_ticker_case():
+    tracker = FailureTracker()
+    for _ in range(tracker.QUARANTINE_AFTER):
+        tracker.record_failure("amc", "no data")
+    assert tracker.should_skip("AMC")
+    assert tracker.is_quarantined("Amc")
+    assert tracker.backing_off() == 1
+    tracker.record_success("AMC")
+    assert not tracker.should_skip("amc")
@@ -0,0 +1,30 @@
+"""
+ReplayProvider re-dating of recorded history
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.providers.replay import ReplayProvider
+
+def write_fixture(root, ticker, index):
+    target = root / ticker
+    target.mkdir(parents=True)
+    closes = np.arange(len(index), dtype=float)
+    frame = pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": closes}, index=index)
+    frame.to_csv(target / "history.csv")
+    return closes
+
+def test_replayed_bars_fall_on_weekdays_ending_at_last_weekday(tmp_path):
+    # Recorded Monday-Friday sessions ending on a Wednesday
+    index = pd.bdate_range(end="2024-05-15", periods=300, name="Date")
+    closes = write_fixture(tmp_path, "GME", index)
+    provider = ReplayProvider(str(tmp_path))
+
+    hist = provider.history("GME", "max")
+    assert (hist.index.dayofweek < 5).all()
+    assert hist.index[-1] == provider._last_weekday()
+    assert hist["Close"].tolist() == closes.tolist()
+
+    bulk = provider.bulk_history(["GME"], "1mo")["GME"]
+    assert (bulk.index.dayofweek < 5).all()
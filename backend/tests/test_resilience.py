@@ -0,0 +1,146 @@
+"""
+Circuit breaker, deadline and hedging behaviour of ResilientProvider
+"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from app.providers.base import MarketDataProvider
+from app.providers.resilient import ResilientProvider
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, UpstreamTimeout
+
+class FakeProvider(MarketDataProvider):
+    """Answers info() from a script of (delay, result or exception) steps, then {}"""
+
+    name = "fake"
+
+    def __init__(self, steps=()):
+        self.steps = list(steps)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def info(self, ticker):
+        with self._lock:
+            self.calls += 1
+            delay, outcome = self.steps.pop(0) if self.steps else (0, {})
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def history(self, ticker, period):
+        return pd.DataFrame()
+
+    def bulk_history(self, tickers, period, start=None):
+        return {}
+
+@pytest.fixture
+def make_provider():
+    """ResilientProvider over a FakeProvider; pools are shut down after the test"""
+    created = []
+
+    def make(steps=(), threshold=2, reset_seconds=60, **kwargs):
+        breakers = {
+            call: CircuitBreaker(call, failure_threshold=threshold, reset_seconds=reset_seconds)
+            for call in ResilientProvider.TIMEOUTS
+        }
+        provider = ResilientProvider(FakeProvider(steps), breakers=breakers, **kwargs)
+        created.append(provider)
+        return provider
+
+    yield make
+    for provider in created:
+        provider.executor.shutdown(wait=True)
+
+# ==========================================
+# CIRCUIT BREAKER
+# ==========================================
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_seconds=60)
+    breaker.record_failure("boom")
+    breaker.before_call()
+    breaker.record_failure("boom")
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_breaker_half_open_allows_one_trial():
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=0)
+    breaker.record_failure("boom")
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker("t", failure_threshold=3, reset_seconds=0)
+    for _ in range(3):
+        breaker.record_failure("boom")
+    breaker.before_call()
+    breaker.record_failure("still down")
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.status()["last_error"] == "still down"
+
+# ==========================================
+# RESILIENT PROVIDER
+# ==========================================
+
+def test_transport_errors_open_the_circuit(make_provider):
+    provider = make_provider([(0, ConnectionError("reset")), (0, ConnectionError("reset"))], timeouts={"info": 0})
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            provider.info("GME")
+    with pytest.raises(CircuitOpenError):
+        provider.info("GME")
+    assert provider.provider.calls == 2
+
+def test_ticker_errors_leave_the_circuit_closed(make_provider):
+    provider = make_provider([(0, KeyError("delisted"))] * 5, timeouts={"info": 0})
+    for _ in range(5):
+        with pytest.raises(KeyError):
+            provider.info("XXXX")
+    assert provider.breakers["info"].state == CircuitBreaker.CLOSED
+    assert provider.info("GME") == {}
+
+def test_ticker_error_ends_half_open_trial(make_provider):
+    provider = make_provider([(0, ValueError("empty frame"))], threshold=1, reset_seconds=0, timeouts={"info": 0})
+    provider.breakers["info"].record_failure("earlier outage")
+    with pytest.raises(ValueError):
+        provider.info("XXXX")
+    assert provider.breakers["info"].state == CircuitBreaker.CLOSED
+
+def test_deadline_raises_timeout_and_counts_as_failure(make_provider):
+    provider = make_provider([(0.5, {"ok": 1})], timeouts={"info": 0.05})
+    started = time.monotonic()
+    with pytest.raises(UpstreamTimeout):
+        provider.info("GME")
+    assert time.monotonic() - started < 0.4
+    assert provider.breakers["info"].failures == 1
+
+def test_slow_call_is_hedged_and_hedge_wins(make_provider):
+    provider = make_provider([(0.5, {"first": 1}), (0, {"hedge": 1})], timeouts={"info": 5}, hedge_percentile=50)
+    provider.calls = 100
+    for _ in range(provider.HEDGE_MIN_SAMPLES):
+        provider.latency["info"].record(0.01)
+
+    started = time.monotonic()
+    assert provider.info("GME") == {"hedge": 1}
+    assert time.monotonic() - started < 0.4
+    assert provider.hedges == 1
+
+def test_hedges_are_capped_by_budget(make_provider):
+    provider = make_provider([(0.1, {"first": 1})], timeouts={"info": 5}, hedge_percentile=50)
+    for _ in range(provider.HEDGE_MIN_SAMPLES):
+        provider.latency["info"].record(0.01)
+
+    # One call made so far, so a 10% budget allows no hedge
+    assert provider.info("GME") == {"first": 1}
+    assert provider.hedges == 0
+    assert provider.provider.calls == 1
@@ -0,0 +1,46 @@
+"""
+ScoreIndex ranking and the scanner snapshot served by /api/scanner/top
+"""
+
+from datetime import datetime
+
+from app.calculators.market_scanner import ScanSnapshot
+from app.utils.score_index import ScoreIndex
+
+def result(ticker, score):
+    return {"ticker": ticker, "score": score}
+
+def test_top_is_best_first_with_ticker_tiebreak():
+    index = ScoreIndex()
+    index.update_many([result("B", 50), result("A", 50), result("C", 90)])
+    assert [r["ticker"] for r in index.top(10)] == ["C", "A", "B"]
+
+def test_update_reranks_without_duplicates():
+    index = ScoreIndex()
+    index.update_many([result("A", 10), result("B", 20)])
+    index.update(result("A", 30))
+    assert [r["ticker"] for r in index.ranked()] == ["A", "B"]
+    assert len(index) == 2
+    assert index.get("A")["score"] == 30
+
+def test_top_respects_limit_and_min_score():
+    index = ScoreIndex()
+    index.update_many(result(f"T{i}", i * 10) for i in range(10))
+    assert [r["score"] for r in index.top(3)] == [90, 80, 70]
+    assert [r["score"] for r in index.top(10, min_score=65)] == [90, 80, 70]
+
+def test_remove_drops_ticker():
+    index = ScoreIndex()
+    index.update_many([result("A", 10), result("B", 20)])
+    index.remove("B")
+    index.remove("missing")
+    assert "B" not in index
+    assert [r["ticker"] for r in index.ranked()] == ["A"]
+
+def test_snapshot_keeps_ranking_after_index_changes():
+    index = ScoreIndex()
+    index.update_many([result("A", 80), result("B", 70)])
+    snapshot = ScanSnapshot(index.ranked(), datetime.now(), {})
+    index.update(result("B", 95))
+    assert [r["ticker"] for r in snapshot.top(limit=10, min_score=75)] == ["A"]
+    assert [r["ticker"] for r in snapshot.top(limit=1, min_score=0)] == ["A"]
@@ -0,0 +1,32 @@
+"""
+ScanUniverse pre-filtering
+"""
+
+import pandas as pd
+
+from app.calculators.scoring import ScoringEngine
+from app.utils.universe import ScanUniverse
+
+def make_universe():
+    return ScanUniverse(pd.DataFrame({
+        "ticker": ["gme", "big", "otc", "off"],
+        "exchange": ["NYSE", "NASDAQ", "OTC", "NYSE"],
+        "float_shares": [3e7, 5e9, 3e7, 3e7],
+        "avg_volume": [1e6, 1e6, 1e6, 1e6],
+        "short_interest": [40, 1, 40, 40],
+        "active": [1, 1, 1, 0]
+    }))
+
+def test_prefilter_drops_inactive_and_other_exchanges():
+    assert make_universe().prefilter(0, ScoringEngine()) == ["GME", "BIG"]
+
+def test_prefilter_leaves_universe_unchanged(monkeypatch):
+    monkeypatch.setattr(ScanUniverse, "SI_HEADROOM", 1.5)
+    universe = make_universe()
+    before = universe.frame.copy()
+    engine = ScoringEngine()
+
+    assert universe.prefilter(60, engine) == ["GME"]
+    assert universe.prefilter(0, engine) == ["GME", "BIG"]
+    pd.testing.assert_frame_equal(universe.frame, before)
+    assert len(universe) == 3